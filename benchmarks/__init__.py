@@ -0,0 +1,4 @@
+"""
+Offline benchmarks for the dashboard data pipeline.
+Run from the project folder, e.g. python -m benchmarks.bench_fetch
+"""
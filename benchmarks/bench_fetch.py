@@ -0,0 +1,55 @@
+"""
+Fetch Benchmark
+Compares per-tab get_all_values(), batched values:batchGet of whole tabs
+and column-projected batchGet (once the header layouts are known) using
+the fake client with simulated network latency, and shows the retry
+path recovering from injected 429 responses.
+"""
+
+import time
+import pandas as pd
+import fetch_scheduler
+from fake_sheets import FakeClient, make_workbook
+from sheets_reader import fetch_sheet_values, parse_sheet
+from config import SHEET_ID
+
+
+def run(tabs=40, rows_per_tab=200, helper_columns=20, latency=0.05, error_rate=0.2):
+    # Lift the per-minute quota and shorten backoff, so only latency counts
+    fetch_scheduler._default_bucket = fetch_scheduler.TokenBucket(10_000)
+    fetch_scheduler.BACKOFF_BASE = latency
+
+    workbook = make_workbook(tabs, rows_per_tab, helper_columns=helper_columns)
+    results = {}
+
+    for label, batch, project, rate in (
+        ('per-tab', False, False, 0.0),
+        ('batch', True, False, 0.0),
+        ('projected', True, True, 0.0),
+        ('per-tab 429s', False, False, error_rate),
+    ):
+        if project:
+            # Parsing a full fetch is what records each tab's header layout
+            for title, values in results['batch'][4]:
+                parse_sheet(title, values)
+        client = FakeClient(workbook, latency=latency, error_rate=rate)
+        start = time.perf_counter()
+        spreadsheet = client.open_by_key(SHEET_ID)
+        values = fetch_sheet_values(spreadsheet, batch=batch, project=project)
+        elapsed = time.perf_counter() - start
+        results[label] = (client.request_count, client.error_count, client.response_bytes, elapsed, values)
+
+    # Every path must parse to the same rows
+    for label in ('batch', 'projected', 'per-tab 429s'):
+        for (title, expected), (_, actual) in zip(results['per-tab'][4], results[label][4]):
+            pd.testing.assert_frame_equal(parse_sheet(title, expected), parse_sheet(title, actual))
+
+    print(f"{tabs} tabs x {rows_per_tab} rows x {6 + helper_columns} columns, "
+          f"{latency * 1000:.0f} ms per request, {fetch_scheduler.FETCH_WORKERS} workers")
+    for label, (requests, errors, size, elapsed, _) in results.items():
+        print(f"  {label:13s} {requests:4d} requests {errors:3d} errors "
+              f"{size / 2**20:7.2f} MiB  {elapsed:7.3f}s")
+
+
+if __name__ == '__main__':
+    run()
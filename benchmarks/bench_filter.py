@@ -0,0 +1,56 @@
+"""
+Filter Benchmark
+Compares the dashboard's copy-and-mask filtering with FilterIndex
+lookups at 100k and 1M rows.
+"""
+
+import time
+from fake_sheets import make_frame
+from sheets_reader import FilterIndex
+
+
+def mask_filter(df, platform=None, creator=None, sheet=None):
+    """The original filter: copy the frame, then apply each mask."""
+    filtered_df = df.copy()
+    if platform is not None:
+        filtered_df = filtered_df[filtered_df['platform'] == platform]
+    if creator is not None:
+        filtered_df = filtered_df[filtered_df['content_creator'] == creator]
+    if sheet is not None:
+        filtered_df = filtered_df[filtered_df['sheet'] == sheet]
+    return filtered_df
+
+
+FILTERS = [
+    ('no filter', {}),
+    ('platform', {'platform': 'TikTok'}),
+    ('creator', {'creator': 'Creator 7'}),
+    ('all three', {'platform': 'TikTok', 'creator': 'Creator 7', 'sheet': 'Creator Tab 3'}),
+]
+
+
+def timed(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(sizes=(100_000, 1_000_000)):
+    for rows in sizes:
+        df = make_frame(rows)
+        build_time, index = timed(lambda: FilterIndex(df), repeat=1)
+        print(f"{rows:,} rows (index build {build_time * 1000:.1f} ms)")
+
+        for label, filters in FILTERS:
+            mask_time, expected = timed(lambda: mask_filter(df, **filters))
+            index_time, actual = timed(lambda: index.select(**filters))
+            assert actual.equals(expected), f"{label}: index and mask results differ"
+            print(f"  {label:10s} mask {mask_time * 1000:8.2f} ms   index {index_time * 1000:8.2f} ms"
+                  f"   ({len(actual):,} rows)")
+
+
+if __name__ == '__main__':
+    run()
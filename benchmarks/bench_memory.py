@@ -0,0 +1,81 @@
+"""
+Memory Benchmark
+Compares peak memory of loading the whole workbook's raw values before
+parsing against streaming tabs through iter_tab_frames(), and relates
+both to the cost of a single tab. Both paths parse with parse_tab() and
+deduplicate with assemble_frames(), so they build the same DataFrame and
+only differ in how long raw cell values are held. FakeClient decodes
+every response from JSON text, so, as with gspread, those raw values are
+fresh allocations rather than the fake workbook's own strings.
+
+Peaks come from tracemalloc, since process RSS can't be reset between
+runs. It sees the Python heap (cell strings, lists, NumPy arrays) but
+not Arrow buffers, so the Arrow-backed video_link and video_key columns
+aren't counted.
+"""
+
+import tracemalloc
+import pandas as pd
+import fetch_scheduler
+from fake_sheets import FakeClient, make_workbook
+from sheets_reader import (
+    assemble_frames, fetch_sheet_values, included_worksheets, iter_tab_frames, parse_tab,
+)
+from config import SHEET_ID
+
+
+def materialized(spreadsheet, batch, max_tabs):
+    """The old load path: every tab's raw values, then every frame, then the concat."""
+    values = fetch_sheet_values(spreadsheet, batch=batch)
+    frames = [(title, parse_tab(title, all_values)) for title, all_values in values]
+    return assemble_frames(frames)
+
+
+def streamed(spreadsheet, batch, max_tabs):
+    """Tabs parsed to typed frames as they arrive, then concatenated."""
+    titles = [ws.title for ws in included_worksheets(spreadsheet)]
+    return assemble_frames(iter_tab_frames(spreadsheet, batch=batch, max_tabs=max_tabs), titles)
+
+
+def single_tab(spreadsheet, batch, max_tabs):
+    """Fetch and parse only the first tab, as a yardstick."""
+    ws = included_worksheets(spreadsheet)[0]
+    return parse_tab(ws.title, ws.get_all_values())
+
+
+def peak(func, *args):
+    """Peak Python-heap bytes allocated while running func, and its result."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        result = func(*args)
+        return tracemalloc.get_traced_memory()[1], result
+    finally:
+        tracemalloc.stop()
+
+
+def run(tabs=40, rows_per_tab=5_000):
+    fetch_scheduler._default_bucket = fetch_scheduler.TokenBucket(10_000)
+    client = FakeClient(make_workbook(tabs, rows_per_tab))
+    spreadsheet = client.open_by_key(SHEET_ID)
+
+    print(f"{tabs} tabs x {rows_per_tab:,} rows, {fetch_scheduler.FETCH_WORKERS} workers")
+    tab_peak, _ = peak(single_tab, spreadsheet, False, None)
+    print(f"  {'one tab':28s} {tab_peak / 2**20:8.1f} MiB")
+
+    expected = None
+    for label, func, batch, max_tabs in (
+        ('materialized, per-tab', materialized, False, None),
+        ('streamed, per-tab', streamed, False, None),
+        ('streamed, batch of 10 tabs', streamed, True, 10),
+        ('streamed, batch of 100 tabs', streamed, True, 100),
+    ):
+        used, df = peak(func, spreadsheet, batch, max_tabs)
+        if expected is None:
+            expected = df
+        pd.testing.assert_frame_equal(df, expected)
+        print(f"  {label:28s} {used / 2**20:8.1f} MiB  ({used / tab_peak:4.1f}x one tab)")
+
+
+if __name__ == '__main__':
+    run()
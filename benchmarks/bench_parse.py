@@ -0,0 +1,101 @@
+"""
+Parse Benchmark
+Times parse_sheet() against the original per-row loop on workbooks of
+several shapes and checks that both produce the same DataFrames.
+"""
+
+import time
+import pandas as pd
+from fake_sheets import make_workbook
+from sheets_reader import COLUMNS, detect_platform, find_columns, parse_number, parse_sheet
+
+
+def parse_sheet_rows(title, all_values):
+    """The original row-at-a-time parser, kept as the reference."""
+    rows = []
+
+    if len(all_values) < 2:
+        return pd.DataFrame(columns=COLUMNS)
+
+    header_row_idx = 0
+    for idx, row in enumerate(all_values):
+        row_text = ' '.join(row).lower()
+        if 'link' in row_text or 'url' in row_text:
+            header_row_idx = idx
+            break
+
+    columns = find_columns(all_values[header_row_idx])
+
+    if columns.get('video_link') is None:
+        return pd.DataFrame(columns=COLUMNS)
+
+    for row in all_values[header_row_idx + 1:]:
+        if len(row) <= columns['video_link']:
+            continue
+
+        video_link = row[columns['video_link']]
+        if not video_link or not video_link.strip():
+            continue
+        if 'http' not in video_link.lower():
+            continue
+
+        content_creator = row[columns['content_creator']] if columns['content_creator'] is not None and len(row) > columns['content_creator'] else ''
+        reactions = parse_number(row[columns['reactions']]) if columns['reactions'] is not None and len(row) > columns['reactions'] else 0
+        comments = parse_number(row[columns['comments']]) if columns['comments'] is not None and len(row) > columns['comments'] else 0
+        shares = parse_number(row[columns['shares']]) if columns['shares'] is not None and len(row) > columns['shares'] else 0
+        views = parse_number(row[columns['views']]) if columns['views'] is not None and len(row) > columns['views'] else 0
+
+        rows.append({
+            'sheet': title,
+            'content_creator': content_creator,
+            'video_link': video_link.strip(),
+            'platform': detect_platform(video_link),
+            'reactions': reactions,
+            'comments': comments,
+            'shares': shares,
+            'views': views,
+            'engagement': reactions + comments + shares,
+        })
+
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+# (tabs, rows per tab): workbooks the size of the real one, then one
+# with a few very long tabs
+SHAPES = [(40, 50), (40, 200), (40, 1_000), (10, 10_000)]
+
+
+def run_shape(tabs, rows_per_tab):
+    workbook = make_workbook(tabs, rows_per_tab)
+
+    def parse_all(parser):
+        return [parser(title, values) for title, values in workbook.items()]
+
+    loop_time, expected = best_of(lambda: parse_all(parse_sheet_rows))
+    vector_time, actual = best_of(lambda: parse_all(parse_sheet))
+
+    for want, got in zip(expected, actual):
+        pd.testing.assert_frame_equal(want, got)
+
+    rows = sum(len(frame) for frame in actual)
+    print(f"{tabs} tabs x {rows_per_tab} rows ({rows} parsed)")
+    print(f"  row loop     {loop_time:7.3f}s")
+    print(f"  parse_sheet  {vector_time:7.3f}s  ({loop_time / vector_time:.1f}x faster)")
+
+
+def run(shapes=SHAPES):
+    for tabs, rows_per_tab in shapes:
+        run_shape(tabs, rows_per_tab)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,36 @@
+"""
+Ranking Benchmark
+Compares nlargest()/sort_values() on a filtered copy with Ranking
+lookups over FilterIndex positions.
+"""
+
+from benchmarks.bench_filter import FILTERS, mask_filter, timed
+from fake_sheets import make_frame
+from ranking import Ranking
+from sheets_reader import FilterIndex
+
+
+def run(sizes=(100_000, 1_000_000)):
+    for rows in sizes:
+        df = make_frame(rows)
+        index = FilterIndex(df)
+        ranking = Ranking(df)
+        build_time, _ = timed(lambda: ranking.order('engagement'), repeat=1)
+        print(f"{rows:,} rows (engagement ordering built in {build_time * 1000:.1f} ms)")
+
+        for label, filters in FILTERS:
+            positions = index.positions(**filters)
+
+            scan_time, expected = timed(lambda: mask_filter(df, **filters).nlargest(10, 'engagement'))
+            rank_time, actual = timed(lambda: ranking.top_rows('engagement', positions, 10))
+            assert actual.equals(expected), f"{label}: ranking and nlargest differ"
+
+            sort_time, _ = timed(lambda: mask_filter(df, **filters).sort_values('engagement', ascending=False).head(50))
+            page_time, _ = timed(lambda: df.take(ranking.page('engagement', positions, 0, 50)[0]))
+
+            print(f"  {label:10s} top 10: nlargest {scan_time * 1000:7.2f} ms  ranking {rank_time * 1000:6.2f} ms"
+                  f" | page of 50: sort {sort_time * 1000:7.2f} ms  ranking {page_time * 1000:6.2f} ms")
+
+
+if __name__ == '__main__':
+    run()
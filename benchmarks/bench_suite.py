@@ -0,0 +1,225 @@
+"""
+Benchmark Suite
+Wall time and peak memory of the load path and of the dashboard's
+per-rerun work at 1k, 100k and 1M rows, measured offline on messy
+synthetic workbooks served by the fake client. Results can be stored
+as a baseline, and later runs flag cases that got slower or bigger.
+
+    python -m benchmarks.bench_suite                   # run, compare with the baseline
+    python -m benchmarks.bench_suite --save-baseline   # run and store the results
+    python -m benchmarks.bench_suite --sizes 1000 100000 --check
+
+Peaks come from tracemalloc (Python heap only, see bench_memory) in a
+separate run from the timings, since tracing slows everything down.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import pandas as pd
+import fetch_scheduler
+from fake_sheets import FakeClient, make_messy_workbook
+from filter_index import combine
+from ranking import Ranking
+from rollup import RollupCube
+from sheets_reader import (
+    FilterIndex, detect_platform, detect_platforms, find_header_row, find_columns,
+    get_summary_stats, parse_number, parse_numbers, read_all_data,
+)
+
+# Results of --save-baseline; machine specific, so not checked in
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Relative growth in time or peak memory over the baseline that counts as a regression
+REGRESSION_THRESHOLD = 0.20
+
+# Timings below this are too noisy to call a regression on
+MIN_SECONDS = 0.02
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+
+# Filter selections replayed by the dashboard rerun case
+FILTERS = [
+    {'platform': None, 'creator': None, 'sheet': None},
+    {'platform': 'TikTok', 'creator': None, 'sheet': None},
+    {'platform': None, 'creator': 'Creator 7', 'sheet': None},
+    {'platform': 'Facebook', 'creator': 'Creator 7', 'sheet': 'Creator Tab 3'},
+]
+
+
+def workbook_cells(workbook):
+    """Every link cell and metric cell below the header rows, as two lists."""
+    links, numbers = [], []
+    for rows in workbook.values():
+        header_idx = find_header_row(rows)
+        columns = find_columns(rows[header_idx])
+        metrics = [columns[field] for field in ('reactions', 'comments', 'shares', 'views')]
+        for row in rows[header_idx + 1:]:
+            if len(row) > columns['video_link']:
+                links.append(row[columns['video_link']])
+            numbers.extend(row[idx] for idx in metrics if idx < len(row))
+    return links, numbers
+
+
+def dashboard_rerun(df, index, cube, ranking):
+    """The data work main() does on a rerun, for each of FILTERS."""
+    for filters in FILTERS:
+        positions = index.positions(**filters)
+        rows = cube.select(**filters)
+        cube.totals(rows)
+        cube.group('platform', rows)
+        cube.top('content_creator', 'engagement', 10, rows)
+        ranking.top_rows('engagement', positions, 10)
+        ranking.top_rows('views', positions, 10, positive=True)
+        for name in ('Facebook', 'TikTok'):
+            ranking.top_rows('views', index.positions(**combine(filters, platform=name)), 10, positive=True)
+        ranking.page('engagement', positions, 0, 50)
+
+
+def build_ranking(df):
+    """A Ranking with the orderings the dashboard always uses."""
+    ranking = Ranking(df)
+    ranking.order('engagement')
+    ranking.order('views')
+    return ranking
+
+
+def cases(rows):
+    """
+    (name, func, items) for one data size; items is the number of
+    values func handles, for a throughput figure (None when not useful).
+    """
+    tabs = max(1, min(40, rows // 2_500))
+    workbook = make_messy_workbook(tabs, rows // tabs)
+    client = FakeClient(workbook)
+    links, numbers = workbook_cells(workbook)
+    link_series = pd.Series(links, dtype=object)
+    number_series = pd.Series(numbers, dtype=object)
+
+    df = read_all_data(client)
+    index = FilterIndex(df)
+    cube = RollupCube(df)
+    ranking = build_ranking(df)
+
+    return [
+        # After the first load each tab's layout is known, so these are projected fetches
+        ('read_all_data', lambda: read_all_data(client), len(df)),
+        ('parse_number', lambda: [parse_number(v) for v in numbers], len(numbers)),
+        ('parse_numbers', lambda: parse_numbers(number_series), len(numbers)),
+        ('detect_platform', lambda: [detect_platform(v) for v in links], len(links)),
+        ('detect_platforms', lambda: detect_platforms(link_series), len(links)),
+        ('get_summary_stats', lambda: get_summary_stats(df), len(df)),
+        ('filter_index', lambda: FilterIndex(df), len(df)),
+        ('rollup_cube', lambda: RollupCube(df), len(df)),
+        ('ranking', lambda: build_ranking(df), len(df)),
+        ('dashboard_rerun', lambda: dashboard_rerun(df, index, cube, ranking), None),
+    ]
+
+
+def measure(func, repeat):
+    """Best wall time over repeat runs, then the tracemalloc peak of one more."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(sizes=DEFAULT_SIZES):
+    """Measure every case at every size. Returns {'<rows>/<case>': result}."""
+    # Lift the per-minute quota, so only local work is measured
+    fetch_scheduler._default_bucket = fetch_scheduler.TokenBucket(1_000_000)
+
+    results = {}
+    for rows in sizes:
+        repeat = 5 if rows <= 100_000 else 1
+        for name, func, items in cases(rows):
+            seconds, peak = measure(func, repeat)
+            results[f"{rows}/{name}"] = {'seconds': seconds, 'peak_bytes': peak, 'items': items}
+    return results
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Print each result next to its baseline. Returns the keys whose time
+    or peak memory grew by more than threshold.
+    """
+    regressions = []
+    print(f"{'case':<28}{'seconds':>10}{'items/s':>12}{'peak MiB':>10}{'time':>9}{'memory':>9}")
+    for key, result in results.items():
+        line = f"{key:<28}{result['seconds']:>10.4f}"
+        rate = result['items'] / result['seconds'] if result['items'] and result['seconds'] else None
+        line += f"{rate:>12,.0f}" if rate else f"{'':>12}"
+        line += f"{result['peak_bytes'] / 2**20:>10.1f}"
+
+        before = baseline.get(key)
+        if before:
+            time_change = result['seconds'] / before['seconds'] - 1 if before['seconds'] else 0.0
+            memory_change = result['peak_bytes'] / before['peak_bytes'] - 1 if before['peak_bytes'] else 0.0
+            line += f"{time_change:>+9.0%}{memory_change:>+9.0%}"
+            slower = time_change > threshold and result['seconds'] >= MIN_SECONDS
+            if slower or memory_change > threshold:
+                regressions.append(key)
+                line += '  REGRESSION'
+        print(line)
+    return regressions
+
+
+def load_baseline(path=BASELINE_FILE):
+    """Stored results, or {} when no baseline was saved yet."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def save_baseline(results, path=BASELINE_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'results': results,
+        }, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline dashboard benchmarks.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="total data rows per run (default: %(default)s)")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the baseline")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="relative growth counted as a regression (default: %(default)s)")
+    parser.add_argument('--check', action='store_true', help="exit with status 1 on any regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes)
+    baseline = load_baseline(args.baseline)
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+    elif not baseline:
+        print("No baseline yet; run with --save-baseline to store one.")
+    elif regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+    return 1 if args.check and regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Client Manager
+Keeps one authorized gspread client per process. The credential source
+is resolved once, the client shares a pooled keep-alive HTTP session and
+its access token is refreshed before it expires, so refresh cycles skip
+the OAuth token exchange and the TLS handshake.
+"""
+
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+import gspread
+import requests
+from google.auth.transport.requests import AuthorizedSession, Request
+from google.oauth2.service_account import Credentials
+from config import SCOPES, CREDENTIALS_FILE, FETCH_WORKERS, TOKEN_REFRESH_MARGIN, SPREADSHEETS
+from tracing import default_tracer, span
+
+
+def resolve_credentials():
+    """
+    Load service account credentials.
+    Supports:
+    1. Streamlit Cloud secrets (st.secrets["gcp_service_account"])
+    2. Local credentials.json file
+    """
+    # Try Streamlit secrets first (for Streamlit Cloud deployment)
+    try:
+        import streamlit as st
+        if "gcp_service_account" in st.secrets:
+            return Credentials.from_service_account_info(
+                st.secrets["gcp_service_account"],
+                scopes=SCOPES
+            )
+    except (ImportError, FileNotFoundError):
+        pass  # No streamlit or no secrets.toml: fall back to local credentials
+
+    # Fall back to local credentials.json
+    if not os.path.exists(CREDENTIALS_FILE):
+        raise FileNotFoundError(
+            f"credentials.json not found!\n\n"
+            f"Please copy credentials.json from fb_video_scraper project,\n"
+            f"or configure Streamlit Cloud secrets."
+        )
+
+    return Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
+
+
+def make_session(credentials, pool_size=None):
+    """
+    An authorized session whose connection pool fits every fetch worker
+    of every source spreadsheet, since those are refreshed at once.
+    """
+    pool_size = pool_size or FETCH_WORKERS * len(SPREADSHEETS)
+    session = AuthorizedSession(credentials)
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.hooks['response'].append(trace_response)
+    return session
+
+
+def trace_response(response, *args, **kwargs):
+    """
+    requests response hook: one 'http' span per API call, with its size.
+    The bytes and request count are also added to the span the call was
+    made under (e.g. 'fetch.batch').
+    """
+    tracer = default_tracer()
+    size = len(response.content)
+    tracer.count('bytes', size)
+    tracer.count('requests')
+    tracer.record(
+        'http',
+        response.elapsed.total_seconds(),
+        method=response.request.method,
+        path=response.request.path_url.split('?')[0],
+        status=response.status_code,
+        bytes=size,
+    )
+
+
+class ClientManager:
+    """
+    Hands out one cached gspread client and counts how often it was
+    reused, rebuilt or had its token refreshed.
+    """
+
+    def __init__(self, load_credentials=resolve_credentials, refresh_margin=TOKEN_REFRESH_MARGIN):
+        self.load_credentials = load_credentials
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self.credentials = None
+        self.session = None
+        self.auth_request = None
+        self.client = None
+        self.reused = 0
+        self.rebuilt = 0
+        self.refreshed = 0
+        self.lock = threading.Lock()
+
+    def _expiring(self):
+        expiry = self.credentials.expiry
+        if not self.credentials.token or expiry is None:
+            return True
+        # google-auth keeps expiry as a naive UTC datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return expiry - now < self.refresh_margin
+
+    def _build(self):
+        if self.credentials is None:
+            self.credentials = self.load_credentials()
+        if self.session is not None:
+            self.session.close()
+        self.session = make_session(self.credentials)
+        # Token exchanges go through a plain session: the authorized one
+        # would refresh the token itself first and send its bearer header
+        self.auth_request = Request()
+        self.client = gspread.authorize(self.credentials, session=self.session)
+        self.rebuilt += 1
+
+    def get(self):
+        """Return the cached client, building it or refreshing its token as needed."""
+        with self.lock, span('client.get') as attrs:
+            if self.client is None:
+                self._build()
+                attrs['cache'] = 'miss'
+            else:
+                self.reused += 1
+                attrs['cache'] = 'hit'
+
+            # Refresh here, once, instead of in whichever fetch thread
+            # happens to notice the token has expired
+            if self._expiring():
+                self.credentials.refresh(self.auth_request)
+                self.refreshed += 1
+                attrs['token_refreshed'] = True
+            return self.client
+
+    def reset(self):
+        """Drop the cached client; the next get() builds a new one."""
+        with self.lock:
+            if self.session is not None:
+                self.session.close()
+            self.session = None
+            self.client = None
+
+    def stats(self):
+        """Reuse/rebuild/refresh counters."""
+        with self.lock:
+            return {'reused': self.reused, 'rebuilt': self.rebuilt, 'refreshed': self.refreshed}
+
+
+_default_manager = None
+_default_manager_lock = threading.Lock()
+
+
+def default_manager():
+    """Process-wide ClientManager used by sheets_reader.get_client()."""
+    global _default_manager
+    with _default_manager_lock:
+        if _default_manager is None:
+            _default_manager = ClientManager()
+        return _default_manager
@@ -19,3 +19,84 @@ DASHBOARD_TITLE = "Video Engagement Dashboard"
 
 # Sheets to exclude from dashboard
 EXCLUDED_SHEETS = ['Employee Edition']
+
+# Spreadsheets merged into the dashboard, one per dance-craze wave. Each
+# entry is a spreadsheet ID or a dict with 'id', an optional 'name' shown
+# in the Source filter (defaults to the ID) and an optional
+# 'excluded_sheets' list (defaults to EXCLUDED_SHEETS), e.g.
+#   {'id': '1AbC...', 'name': 'Wave 2', 'excluded_sheets': ['Drafts']}
+SPREADSHEETS = [SHEET_ID]
+
+# Fetch every tab with one values:batchGet call instead of one call per tab
+BATCH_FETCH = True
+
+# Split the batchGet request once it covers too many tabs or its URL gets
+# too long. Chunks are fetched concurrently and parsed as they arrive, so
+# smaller chunks also keep fewer tabs of raw cell values in memory at once.
+BATCH_GET_MAX_TABS = 10
+BATCH_GET_MAX_URL_LENGTH = 8000
+
+# Once a tab's header layout is known, fetch only its mapped columns
+# (plus the header rows, to notice layout changes) instead of every column
+PROJECTED_FETCH = True
+
+# Seconds between change checks (one Drive modifiedTime lookup each)
+REFRESH_INTERVAL = 300
+
+# Local Arrow snapshot of the last load, served on cold start
+SNAPSHOT_FILE = 'data_snapshot.arrow'
+
+# Store video links in an Arrow-backed string column (needs pyarrow)
+ARROW_STRINGS = True
+
+# Concurrent fetching: worker threads for tab/chunk requests
+FETCH_WORKERS = 4
+
+# Sheets API read quota is 60 requests per minute per user
+SHEETS_READS_PER_MINUTE = 60
+
+# Retries for 429/5xx responses, with jittered exponential backoff (seconds)
+FETCH_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 32.0
+
+# Refresh the cached client's access token this many seconds before it expires
+TOKEN_REFRESH_MARGIN = 300
+
+# Optional fixed layout per tab, which skips header detection for it.
+# Maps a tab title to its 1-based header row and column letters, e.g.
+#   'Creator Tab 1': {'header_row': 2, 'columns': {'content_creator': 'A', 'video_link': 'B', 'views': 'F'}}
+# Fields left out (reactions, comments, shares, views) read as empty.
+SHEET_SCHEMAS = {}
+
+# Count a video once even when its link is pasted into several tabs or
+# carries different tracking parameters (first occurrence wins)
+DEDUPE_VIDEOS = True
+
+# Raw URLs whose canonical video key is remembered across refreshes. Keys
+# are kept in the tab frames, so this only spares a re-parsed tab from
+# extracting the links it already had; about one large tab's worth keeps
+# the cache small next to the data (see benchmarks/bench_memory.py).
+VIDEO_KEY_CACHE_SIZE = 5_000
+
+# Memory cap for built chart figures, measured by their estimated JSON size
+FIGURE_CACHE_BYTES = 32 * 1024 * 1024
+
+# SQLite file recording each load's per-video metrics for growth tracking
+# (only rows whose metrics changed are stored); None turns it off
+HISTORY_DB = 'engagement_history.sqlite'
+
+# Timing spans kept in memory for the admin panel and --profile
+TRACE_MAX_SPANS = 5000
+# Append every finished span to this JSON lines file; None keeps them in memory only
+TRACE_FILE = None
+# Show the load timing breakdown in the dashboard sidebar (also ?admin=1)
+ADMIN_PANEL = False
+
+# Local HTTP/JSON query service (python query_service.py)
+QUERY_SERVICE_HOST = '127.0.0.1'
+QUERY_SERVICE_PORT = 8765
+# Largest top-N / page size a query may ask for
+QUERY_MAX_ROWS = 1000
+# Memory cap for cached JSON responses, per data load
+QUERY_CACHE_BYTES = 16 * 1024 * 1024
@@ -0,0 +1,16 @@
+"""
+Test Fixtures
+Shared pytest setup. Kept at the repository root so the flat modules
+import from any working directory.
+"""
+
+import pytest
+import fetch_scheduler
+import sheets_reader
+
+
+@pytest.fixture(autouse=True)
+def offline_load_path(monkeypatch):
+    """Lift the per-minute read quota and start with no remembered tab layouts."""
+    monkeypatch.setattr(fetch_scheduler, '_default_bucket', fetch_scheduler.TokenBucket(1_000_000))
+    monkeypatch.setattr(sheets_reader, '_layouts', {})
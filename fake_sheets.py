@@ -0,0 +1,393 @@
+"""
+Fake Google Sheets Client
+Local stand-in for the gspread client used by sheets_reader.
+Counts API requests and can add per-request latency and rate-limit
+errors, so load paths can be measured without live Google credentials.
+"""
+
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+import requests
+from gspread.exceptions import APIError
+from gspread.utils import a1_range_to_grid_range
+from config import SHEET_ID
+from tracing import default_tracer
+
+
+def _unquote_title(range_name):
+    """Turn an A1 range like 'My ''Tab'''!A1:B2 back into the tab title."""
+    if '!' in range_name and range_name.rfind("'") < range_name.rfind('!'):
+        range_name = range_name[:range_name.rfind('!')]
+    if range_name.startswith("'") and range_name.endswith("'"):
+        range_name = range_name[1:-1].replace("''", "'")
+    return range_name
+
+
+def _api_error(status):
+    """An APIError shaped like the one gspread raises for an HTTP error."""
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps({
+        'error': {'code': status, 'message': 'Simulated error', 'status': 'RESOURCE_EXHAUSTED'},
+    }).encode()
+    return APIError(response)
+
+
+def _cut_range(values, range_name):
+    """The part of a tab's values covered by an A1 range ('Tab'!B3:B, 'Tab'!1:2)."""
+    if '!' not in range_name or range_name.rfind("'") > range_name.rfind('!'):
+        return values
+    grid = a1_range_to_grid_range(range_name[range_name.rfind('!') + 1:])
+    rows = values[grid.get('startRowIndex', 0):grid.get('endRowIndex')]
+    if 'startColumnIndex' in grid or 'endColumnIndex' in grid:
+        rows = [row[grid.get('startColumnIndex', 0):grid.get('endColumnIndex')] for row in rows]
+    return rows
+
+
+def _transpose(rows):
+    """Rows to columns, padding short rows with empty cells."""
+    width = max((len(row) for row in rows), default=0)
+    return [[row[col] if col < len(row) else '' for row in rows] for col in range(width)]
+
+
+def _trim(values):
+    """Drop trailing empty cells and rows, like the Sheets values API does."""
+    trimmed = []
+    for row in values:
+        row = list(row)
+        while row and row[-1] == '':
+            row.pop()
+        trimmed.append(row)
+    while trimmed and not trimmed[-1]:
+        trimmed.pop()
+    return trimmed
+
+
+class FakeWorksheet:
+    """A single tab holding a list-of-lists of cell strings."""
+
+    def __init__(self, spreadsheet, title, values, sheet_id):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self.values = values
+
+    def get_all_values(self):
+        self.spreadsheet.client._request('get_all_values', data=True, latency=self.spreadsheet.latency)
+        width = max((len(row) for row in self.values), default=0)
+        return self.spreadsheet.client._respond([list(row) + [''] * (width - len(row)) for row in self.values])
+
+
+class FakeSpreadsheet:
+    """A workbook made of FakeWorksheets. latency, when set, overrides the client's for its data requests."""
+
+    def __init__(self, client, key, tabs, latency=None):
+        self.client = client
+        self.id = key
+        self.title = key
+        self.latency = latency
+        self._worksheets = [
+            FakeWorksheet(self, title, values, sheet_id)
+            for sheet_id, (title, values) in enumerate(tabs.items())
+        ]
+        self.touch()
+
+    def touch(self):
+        """Bump the Drive modifiedTime, as any edit to the sheet would."""
+        self.modified_time = datetime.now(timezone.utc).isoformat()
+
+    def set_values(self, title, values):
+        """Replace (or add) a tab's values and bump the modified time."""
+        for ws in self._worksheets:
+            if ws.title == title:
+                ws.values = values
+                break
+        else:
+            self._worksheets.append(FakeWorksheet(self, title, values, len(self._worksheets)))
+        self.touch()
+
+    def worksheets(self):
+        self.client._request('worksheets')
+        return list(self._worksheets)
+
+    def worksheet(self, title):
+        self.client._request('worksheet')
+        for ws in self._worksheets:
+            if ws.title == title:
+                return ws
+        raise KeyError(title)
+
+    def values_batch_get(self, ranges, params=None):
+        self.client._request('values_batch_get', data=True, latency=self.latency)
+        by_title = {ws.title: ws for ws in self._worksheets}
+        value_ranges = []
+        for range_name in ranges:
+            ws = by_title[_unquote_title(range_name)]
+            value_range = {'range': range_name, 'majorDimension': 'ROWS'}
+            values = _trim(_cut_range(ws.values, range_name))
+            if (params or {}).get('majorDimension') == 'COLUMNS':
+                values = _trim(_transpose(values))
+            if values:
+                value_range['values'] = values
+            value_ranges.append(value_range)
+        return self.client._respond({'spreadsheetId': self.id, 'valueRanges': value_ranges})
+
+
+class FakeClient:
+    """
+    Drop-in replacement for a gspread client.
+    tabs maps worksheet title -> list of rows; latency is slept on
+    every request to simulate a network round trip. error_rate is the
+    chance that a data request (get_all_values/values_batch_get) fails
+    with a 429, like a quota-exceeded response.
+    """
+
+    def __init__(self, tabs=None, latency=0.0, key=SHEET_ID, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.request_count = 0
+        self.error_count = 0
+        self.response_bytes = 0
+        self.request_log = []
+        self._failures = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._spreadsheets = {}
+        if tabs is not None:
+            self.add_spreadsheet(key, tabs)
+
+    def add_spreadsheet(self, key, tabs, latency=None):
+        self._spreadsheets[key] = FakeSpreadsheet(self, key, tabs, latency)
+        return self._spreadsheets[key]
+
+    def open_by_key(self, key):
+        self._request('open_by_key')
+        return self._spreadsheets[key]
+
+    def get_file_drive_metadata(self, key):
+        self._request('get_file_drive_metadata')
+        spreadsheet = self._spreadsheets[key]
+        return {
+            'id': key,
+            'name': spreadsheet.title,
+            'modifiedTime': spreadsheet.modified_time,
+        }
+
+    def fail_next(self, count=1, status=429):
+        """Make the next count data requests fail with the given HTTP status."""
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    def reset_counters(self):
+        with self._lock:
+            self.request_count = 0
+            self.error_count = 0
+            self.response_bytes = 0
+            self.request_log = []
+
+    def _respond(self, payload):
+        """
+        payload as gspread would return it: decoded from JSON text, so
+        callers get fresh cell strings rather than the workbook's own.
+        The text's length is added to response_bytes.
+        """
+        text = json.dumps(payload)
+        with self._lock:
+            self.response_bytes += len(text)
+        default_tracer().count('bytes', len(text))
+        return json.loads(text)
+
+    def _request(self, name, data=False, latency=None):
+        status = None
+        with self._lock:
+            self.request_count += 1
+            self.request_log.append(name)
+            if data:
+                if self._failures:
+                    status = self._failures.pop(0)
+                elif self.error_rate and self._random.random() < self.error_rate:
+                    status = 429
+            if status is not None:
+                self.error_count += 1
+        latency = self.latency if latency is None else latency
+        if latency:
+            time.sleep(latency)
+        # Traced like a real API call (see client_manager.trace_response)
+        tracer = default_tracer()
+        tracer.count('requests')
+        tracer.record('http', latency, method='FAKE', path=name, status=status or 200)
+        if status is not None:
+            raise _api_error(status)
+
+
+def make_workbook(tabs=40, rows_per_tab=50, seed=0, helper_columns=0):
+    """
+    Generate a workbook dict shaped like the real engagement sheet.
+    helper_columns adds that many unused note columns to every tab.
+    """
+    rng = random.Random(seed)
+    hosts = [
+        'https://www.facebook.com/reel/',
+        'https://www.instagram.com/reel/',
+        'https://www.tiktok.com/@creator/video/',
+        'https://youtu.be/',
+    ]
+
+    def number():
+        value = rng.randint(0, 2_000_000)
+        if value >= 1_000_000:
+            return f"{value / 1_000_000:.1f}M"
+        if value >= 10_000:
+            return f"{value / 1_000:.1f}K"
+        return f"{value:,}"
+
+    workbook = {}
+    for tab in range(tabs):
+        rows = [
+            ['Dance Craze Wave', '', '', '', '', ''] + [''] * helper_columns,
+            ['Content Creator', 'Video Link', 'Reactions', 'Comments', 'Shares', 'Views']
+            + [f"Notes {col + 1}" for col in range(helper_columns)],
+        ]
+        for row in range(rows_per_tab):
+            if rng.random() < 0.05:
+                rows.append([''] * (6 + helper_columns))
+                continue
+            link = f"{rng.choice(hosts)}{tab}{row}{rng.randint(0, 10**9)}"
+            rows.append([
+                f"Creator {rng.randint(1, 200)}",
+                link,
+                number(),
+                number(),
+                number(),
+                number() if rng.random() < 0.7 else '',
+            ] + [f"checked, see note {rng.randint(0, 10**6)}" for _ in range(helper_columns)])
+        workbook[f"Creator Tab {tab + 1}"] = rows
+    return workbook
+
+
+# Header spellings seen across real tabs, per field (creator always comes first)
+MESSY_HEADERS = {
+    'content_creator': ['Content Creator', 'Creator', 'Name', ' creator name '],
+    'video_link': ['Video Link', 'Link', 'URL', 'video url '],
+    'reactions': ['Reactions', 'Likes', 'likes', 'Total Reactions'],
+    'comments': ['Comments', '# Comments', 'comments '],
+    'shares': ['Shares', 'Share Count', 'SHARES'],
+    'views': ['Views', 'Plays', 'Video Views'],
+}
+
+
+def make_messy_workbook(tabs=40, rows_per_tab=50, seed=0):
+    """
+    Generate a workbook with the mess hand-kept tabs accumulate: title
+    rows above the header, differently spelled and ordered headers,
+    K/M-suffixed, comma-grouped and placeholder numbers, padded and
+    tracking-tagged links from mixed platforms, blank, short and
+    non-link rows.
+    """
+    rng = random.Random(seed)
+    hosts = [
+        'https://www.facebook.com/reel/',
+        'https://fb.watch/',
+        'https://www.instagram.com/reel/',
+        'https://www.tiktok.com/@creator/video/',
+        'https://www.youtube.com/shorts/',
+        'https://youtu.be/',
+        'https://vimeo.com/',
+    ]
+    placeholders = ['', '', '-', 'N/A', 'n/a', 'TBD']
+
+    def number():
+        roll = rng.random()
+        if roll < 0.1:
+            return rng.choice(placeholders)
+        value = rng.randint(0, 2_000_000)
+        if roll < 0.4 and value >= 10_000:
+            suffix, scale = ('M', 1_000_000) if value >= 1_000_000 else ('K', 1_000)
+            return f"{value / scale:.1f}{rng.choice([suffix, suffix.lower()])}"
+        if roll < 0.7:
+            return f"{value:,}"
+        return f" {value} " if roll < 0.75 else str(value)
+
+    def link(tab, row):
+        url = f"{rng.choice(hosts)}{tab}{row}{rng.randint(0, 10**9)}"
+        roll = rng.random()
+        if roll < 0.1:
+            url += '?utm_source=sheet&si=' + str(rng.randint(0, 10**6))
+        elif roll < 0.15:
+            url = f"  {url} "
+        elif roll < 0.18:
+            url = url.upper()
+        return url
+
+    workbook = {}
+    for tab in range(tabs):
+        fields = list(MESSY_HEADERS)
+        order = [fields[0]] + rng.sample(fields[1:], len(fields) - 1)
+        rows = [[rng.choice(['Campaign', 'Dance Craze Wave', 'Q3 Push'])] + [''] * (len(order) - 1)]
+        rows += [[''] * len(order) for _ in range(rng.randint(0, 2))]
+        rows.append([rng.choice(MESSY_HEADERS[field]) for field in order])
+
+        for row in range(rows_per_tab):
+            roll = rng.random()
+            if roll < 0.05:
+                rows.append([''] * len(order))
+                continue
+            if roll < 0.07:
+                rows.append([f"Creator {rng.randint(1, 200)}", 'pending'])
+                continue
+            cells = {
+                'content_creator': f"Creator {rng.randint(1, 200)}",
+                'video_link': link(tab, row),
+                'reactions': number(),
+                'comments': number(),
+                'shares': number(),
+                'views': number() if rng.random() < 0.7 else '',
+            }
+            values = [cells[field] for field in order]
+            while values and values[-1] == '':
+                values.pop()  # The API trims trailing empty cells
+            rows.append(values)
+        workbook[f"Creator Tab {tab + 1}"] = rows
+    return workbook
+
+
+def make_frame(rows=100_000, tabs=40, creators=200, seed=0):
+    """
+    Generate an already-parsed engagement DataFrame directly with NumPy.
+    Much faster than make_workbook() + parsing for large benchmark sizes.
+    """
+    import numpy as np
+    import pandas as pd
+    from schema import apply_schema
+
+    rng = np.random.default_rng(seed)
+    platforms = np.array(['Facebook', 'Instagram', 'TikTok', 'YouTube'])
+    hosts = np.array([
+        'https://www.facebook.com/reel/',
+        'https://www.instagram.com/reel/',
+        'https://www.tiktok.com/@creator/video/',
+        'https://youtu.be/',
+    ])
+
+    platform_codes = rng.integers(0, len(platforms), rows)
+    metrics = rng.integers(0, 2_000_000, size=(rows, 4))
+    metrics[:, 3] *= rng.random(rows) < 0.7  # about 30% of posts have no views
+
+    df = pd.DataFrame({
+        'source': pd.Categorical.from_codes(np.zeros(rows, dtype=np.int8), [SHEET_ID]),
+        'sheet': pd.Categorical.from_codes(
+            rng.integers(0, tabs, rows), [f"Creator Tab {i + 1}" for i in range(tabs)]),
+        'content_creator': pd.Categorical.from_codes(
+            rng.integers(0, creators, rows), [f"Creator {i + 1}" for i in range(creators)]),
+        'video_link': np.char.add(hosts[platform_codes], np.arange(rows).astype(str)),
+        'platform': platforms[platform_codes],
+        'reactions': metrics[:, 0],
+        'comments': metrics[:, 1],
+        'shares': metrics[:, 2],
+        'views': metrics[:, 3],
+    })
+    df['engagement'] = df['reactions'] + df['comments'] + df['shares']
+    return apply_schema(df)
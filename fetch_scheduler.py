@@ -0,0 +1,123 @@
+"""
+Fetch Scheduler
+Pulls worksheet values through a bounded thread pool, keeps under the
+Sheets per-minute read quota with a token bucket and retries 429/5xx
+responses with jittered exponential backoff.
+"""
+
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import requests
+from gspread.exceptions import APIError
+from config import (
+    FETCH_WORKERS, SHEETS_READS_PER_MINUTE,
+    FETCH_RETRIES, BACKOFF_BASE, BACKOFF_MAX,
+)
+
+# HTTP statuses worth retrying: rate limited or a server-side failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Blocking token bucket: at most `rate` acquisitions per `per` seconds."""
+
+    def __init__(self, rate, per=60.0, capacity=None):
+        self.rate = rate
+        self.per = per
+        self.capacity = capacity or rate
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated) * self.rate / self.per,
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * self.per / self.rate
+            time.sleep(wait)
+
+
+_default_bucket = None
+_default_bucket_lock = threading.Lock()
+
+
+def default_bucket():
+    """Process-wide bucket shared by every fetch, sized by SHEETS_READS_PER_MINUTE."""
+    global _default_bucket
+    with _default_bucket_lock:
+        if _default_bucket is None:
+            _default_bucket = TokenBucket(SHEETS_READS_PER_MINUTE)
+        return _default_bucket
+
+
+def is_retryable(exc):
+    """True for rate-limit/server errors and dropped connections."""
+    if isinstance(exc, APIError):
+        status = getattr(exc.response, 'status_code', None) or exc.code
+        return status in RETRY_STATUSES
+    return isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def call_with_retries(func, *args, bucket=None, retries=None, base=None, cap=None, sleep=time.sleep):
+    """
+    Call func(*args) under the rate limiter, retrying transient failures
+    with "full jitter" exponential backoff: a random wait between 0 and
+    min(cap, base * 2**attempt) seconds.
+    """
+    bucket = bucket or default_bucket()
+    retries = FETCH_RETRIES if retries is None else retries
+    base = BACKOFF_BASE if base is None else base
+    cap = BACKOFF_MAX if cap is None else cap
+
+    attempt = 0
+    while True:
+        bucket.acquire()
+        try:
+            return func(*args)
+        except Exception as exc:
+            if attempt >= retries or not is_retryable(exc):
+                raise
+            sleep(random.uniform(0, min(cap, base * 2 ** attempt)))
+            attempt += 1
+
+
+def run_concurrently(tasks, max_workers=None, bucket=None, max_pending=None):
+    """
+    Run (key, func, args) tasks on a bounded thread pool with retries.
+    Yields (key, result) in completion order, so callers can process
+    each result while the rest are still in flight.
+
+    Tasks are submitted lazily and at most max_pending (default twice
+    the worker count) are outstanding at once, so results pile up no
+    further than that when the caller is slower than the fetches.
+    """
+    max_workers = max_workers or FETCH_WORKERS
+    max_pending = max_pending or 2 * max_workers
+    tasks = iter(tasks)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sheets-fetch') as pool:
+        pending = {}
+        try:
+            while True:
+                for key, func, args in itertools.islice(tasks, max_pending - len(pending)):
+                    pending[pool.submit(call_with_retries, func, *args, bucket=bucket)] = key
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,94 @@
+"""
+Figure Cache
+Built Plotly figures and rendered HTML tables keyed by chart and filter
+selection, so a rerun with the same filters (e.g. after an unrelated
+widget moved) skips both the aggregation and the rendering. Least recently used
+figures are evicted once their total estimated JSON size passes the memory cap.
+The LRU itself, BoundedCache, also holds the query service's JSON responses.
+"""
+
+import threading
+from collections import OrderedDict
+import numpy as np
+from config import FIGURE_CACHE_BYTES
+
+# Allowance for a figure's layout in its estimated size. Nearly all of it
+# is the default template, about 7 KB of JSON for every figure
+LAYOUT_BYTES = 8_000
+
+
+def _value_size(value):
+    """Rough JSON size of a trace property: arrays by their bytes, strings by length."""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(len(key) + _value_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return sum(_value_size(item) for item in value)
+    return 8
+
+
+def estimate_size(figure):
+    """
+    Rough memory cost of a cached figure, or the length of an HTML string.
+    Only the traces are measured, since encoding the whole figure with
+    to_json() would cost more than many of the builds it is cached for.
+    """
+    if figure is None:
+        return 0
+    if isinstance(figure, str):
+        return len(figure)
+    return LAYOUT_BYTES + sum(_value_size(trace.to_plotly_json()) for trace in figure.data)
+
+
+class BoundedCache:
+    """LRU of built values, capped by their total size as measured by size(value)."""
+
+    def __init__(self, max_bytes, size=len):
+        self.max_bytes = max_bytes
+        self.size = size
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, build):
+        """
+        The value cached under key, or build()'s result, cached first.
+        build may return None (e.g. when there is nothing to draw); that
+        is cached too.
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0]
+            self.misses += 1
+
+        value = build()
+        size = 0 if value is None else self.size(value)
+
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes and len(self.entries) > 1:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+        return value
+
+
+class FigureCache(BoundedCache):
+    """BoundedCache of built figures (or HTML strings), sized by estimate_size()."""
+
+    def __init__(self, max_bytes=FIGURE_CACHE_BYTES):
+        super().__init__(max_bytes, estimate_size)
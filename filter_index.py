@@ -0,0 +1,104 @@
+"""
+Filter Index
+Maps each platform, creator, sheet and source value to the sorted row
+positions holding it, built once per data load. Sidebar filters intersect
+those position arrays instead of copying and masking the whole frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Filter arguments, keyed to the column they index
+FILTER_COLUMNS = {'platform': 'platform', 'creator': 'content_creator', 'sheet': 'sheet', 'source': 'source'}
+
+
+def _group_positions(column):
+    """Return {value: sorted row positions} for one column."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy()
+        values = column.cat.categories
+    else:
+        codes, values = pd.factorize(column)
+
+    dtype = np.int32 if len(column) < 2 ** 31 else np.int64
+    # A stable sort keeps positions ascending within each value
+    order = np.argsort(codes, kind='stable').astype(dtype)
+    counts = np.bincount(codes[codes >= 0], minlength=len(values))
+    starts = np.searchsorted(codes[order], 0)  # skip missing values (code -1)
+    offsets = starts + np.concatenate(([0], np.cumsum(counts)))
+
+    return {
+        value: order[offsets[i]:offsets[i + 1]]
+        for i, value in enumerate(values)
+        if counts[i]
+    }
+
+
+def combine(filters, **extra):
+    """
+    Merge extra restrictions into a filters dict. When both set the same
+    argument to different values the result matches nothing.
+    """
+    merged = dict(filters)
+    for arg, value in extra.items():
+        current = merged.get(arg)
+        if current is None or current == value:
+            merged[arg] = value
+        else:
+            merged[arg] = []
+    return merged
+
+
+class FilterIndex:
+    """Row positions per platform, creator, sheet and source value of a DataFrame."""
+
+    def __init__(self, df):
+        self.df = df
+        self.positions_by = {
+            arg: _group_positions(df[col]) if col in df.columns else {}
+            for arg, col in FILTER_COLUMNS.items()
+        }
+
+    def values(self, arg):
+        """Distinct values present for a filter argument."""
+        return list(self.positions_by[arg])
+
+    def _lookup(self, arg, value):
+        index = self.positions_by[arg]
+        empty = np.empty(0, dtype=np.int64)
+        if isinstance(value, (list, tuple, set)):
+            parts = [index.get(v, empty) for v in value]
+            return np.unique(np.concatenate(parts)) if parts else empty
+        return index.get(value, empty)
+
+    def positions(self, platform=None, creator=None, sheet=None, source=None):
+        """
+        Sorted row positions matching the filter, or None when nothing
+        is filtered. Each argument is None, a value or a list of values.
+        """
+        selected = [
+            self._lookup(arg, value)
+            for arg, value in (('platform', platform), ('creator', creator), ('sheet', sheet), ('source', source))
+            if value is not None
+        ]
+        if not selected:
+            return None
+
+        # Intersect smallest first, so each step works on the fewest rows
+        selected.sort(key=len)
+        result = selected[0]
+        for other in selected[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, other, assume_unique=True)
+        return result
+
+    def select(self, platform=None, creator=None, sheet=None, source=None):
+        """
+        Rows matching the filter. With no filter this is the indexed frame
+        itself (not a copy), so callers must not modify it in place.
+        """
+        positions = self.positions(platform=platform, creator=creator, sheet=sheet, source=source)
+        if positions is None:
+            return self.df
+        return self.df.take(positions)
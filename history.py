@@ -0,0 +1,152 @@
+"""
+Engagement History
+Append-only SQLite store of per-video metrics over time, keyed by the
+canonical video key and load timestamp. A video only gets a new row
+when one of its metrics changed, so the file grows with changes rather
+than with refreshes. Growth over the last N hours is answered from the
+(video_key, recorded_at) primary key without scanning the full history.
+"""
+
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from video_urls import video_keys
+from config import HISTORY_DB
+
+HISTORY_METRICS = ['reactions', 'comments', 'shares', 'views', 'engagement']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metrics (
+    video_key TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    reactions INTEGER, comments INTEGER, shares INTEGER, views INTEGER, engagement INTEGER,
+    PRIMARY KEY (video_key, recorded_at)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS latest (
+    video_key TEXT PRIMARY KEY,
+    recorded_at REAL NOT NULL,
+    reactions INTEGER, comments INTEGER, shares INTEGER, views INTEGER, engagement INTEGER
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS latest_recorded_at ON latest (recorded_at);
+
+CREATE TABLE IF NOT EXISTS videos (
+    video_key TEXT PRIMARY KEY,
+    video_link TEXT, platform TEXT, content_creator TEXT, sheet TEXT, source TEXT
+) WITHOUT ROWID;
+"""
+
+# Per-video details kept in the videos table
+VIDEO_COLUMNS = ['video_link', 'platform', 'content_creator', 'sheet', 'source']
+
+_COLUMNS = ', '.join(HISTORY_METRICS)
+_CHANGED = ' OR '.join(f"i.{m} IS NOT l.{m}" for m in HISTORY_METRICS)
+
+
+def connect(path=HISTORY_DB):
+    """Open the history database, creating its tables on first use."""
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')  # Readers don't block the background writer
+    conn.executescript(SCHEMA)
+    # Files written before the dashboard merged several spreadsheets lack the source column
+    if 'source' not in {row[1] for row in conn.execute('PRAGMA table_info(videos)')}:
+        conn.execute('ALTER TABLE videos ADD COLUMN source TEXT')
+    return conn
+
+
+def record_snapshot(df, recorded_at=None, path=HISTORY_DB):
+    """
+    Record the per-video metrics of one load. Only videos that are new or
+    whose metrics differ from their latest recorded row are written.
+    Returns the number of rows added.
+    """
+    if df.empty:
+        return 0
+    recorded_at = time.time() if recorded_at is None else recorded_at
+
+    keys = df['video_key'].astype(object) if 'video_key' in df.columns else video_keys(df['video_link'])
+    rows = pd.DataFrame({'video_key': np.asarray(keys, dtype=object)})
+    for col in HISTORY_METRICS:
+        rows[col] = df[col].to_numpy().astype('int64')
+    for col in VIDEO_COLUMNS:
+        rows[col] = df[col].astype(object).to_numpy() if col in df.columns else None
+    rows = rows.dropna(subset=['video_key']).drop_duplicates('video_key')
+
+    conn = connect(path)
+    try:
+        with conn:
+            conn.execute(f"CREATE TEMP TABLE incoming (video_key TEXT PRIMARY KEY, {_COLUMNS})")
+            conn.executemany(
+                f"INSERT INTO incoming VALUES (?, {', '.join('?' * len(HISTORY_METRICS))})",
+                rows[['video_key'] + HISTORY_METRICS].itertuples(index=False, name=None),
+            )
+            added = conn.execute(
+                f"""INSERT INTO metrics (video_key, recorded_at, {_COLUMNS})
+                    SELECT i.video_key, ?, {', '.join('i.' + m for m in HISTORY_METRICS)}
+                    FROM incoming i LEFT JOIN latest l ON l.video_key = i.video_key
+                    WHERE l.video_key IS NULL OR {_CHANGED}""",
+                (recorded_at,),
+            ).rowcount
+            # incoming against latest again, before it is updated: the same rows
+            # that were just added to metrics, found through latest's key
+            conn.execute(
+                f"""INSERT OR REPLACE INTO latest (video_key, recorded_at, {_COLUMNS})
+                    SELECT i.video_key, ?, {', '.join('i.' + m for m in HISTORY_METRICS)}
+                    FROM incoming i LEFT JOIN latest l ON l.video_key = i.video_key
+                    WHERE l.video_key IS NULL OR {_CHANGED}""",
+                (recorded_at,),
+            )
+            conn.executemany(
+                f"""INSERT INTO videos (video_key, {', '.join(VIDEO_COLUMNS)})
+                    VALUES ({', '.join('?' * (len(VIDEO_COLUMNS) + 1))})
+                    ON CONFLICT (video_key) DO UPDATE SET
+                    {', '.join(f"{col} = excluded.{col}" for col in VIDEO_COLUMNS)}""",
+                rows[['video_key'] + VIDEO_COLUMNS].itertuples(index=False, name=None),
+            )
+            conn.execute("DROP TABLE incoming")
+        return added
+    finally:
+        conn.close()
+
+
+def growth(hours, now=None, path=HISTORY_DB, limit=None, order_by='views_growth'):
+    """
+    Metric growth per video over the last `hours` hours, largest first.
+    The baseline is a video's last row at or before the window start (or
+    its first row, for videos first seen inside the window); only videos
+    whose latest row falls inside the window are looked at. Adds
+    <metric>_growth and <metric>_per_hour columns plus the video details.
+    """
+    now = time.time() if now is None else now
+    cutoff = now - hours * 3600
+
+    baseline = ', '.join(f"b.{m} AS base_{m}" for m in HISTORY_METRICS)
+    query = f"""
+        SELECT l.video_key, l.recorded_at, {', '.join('l.' + m for m in HISTORY_METRICS)},
+               b.recorded_at AS base_recorded_at, {baseline},
+               {', '.join('v.' + col for col in VIDEO_COLUMNS)}
+        FROM latest l
+        JOIN metrics b ON b.video_key = l.video_key AND b.recorded_at = COALESCE(
+            (SELECT MAX(recorded_at) FROM metrics
+             WHERE video_key = l.video_key AND recorded_at <= :cutoff),
+            (SELECT MIN(recorded_at) FROM metrics WHERE video_key = l.video_key))
+        LEFT JOIN videos v ON v.video_key = l.video_key
+        WHERE l.recorded_at > :cutoff AND l.recorded_at <= :now
+    """
+    conn = connect(path)
+    try:
+        df = pd.read_sql_query(query, conn, params={'cutoff': cutoff, 'now': now})
+    finally:
+        conn.close()
+
+    elapsed = (df['recorded_at'] - df['base_recorded_at']) / 3600
+    for m in HISTORY_METRICS:
+        df[f"{m}_growth"] = df[m] - df[f"base_{m}"]
+        df[f"{m}_per_hour"] = (df[f"{m}_growth"] / elapsed).where(elapsed > 0, 0.0)
+    df = df[df[[f"{m}_growth" for m in HISTORY_METRICS]].ne(0).any(axis=1)]
+    df = df.drop(columns=[f"base_{m}" for m in HISTORY_METRICS])
+    df = df.sort_values(order_by, ascending=False, kind='stable')
+    if limit is not None:
+        df = df.head(limit)
+    return df.reset_index(drop=True)
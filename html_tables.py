@@ -0,0 +1,61 @@
+"""
+HTML Tables
+Renders the small "Top 10" tables as HTML with clickable video links.
+Links, numbers and text are formatted with vectorized string operations,
+and every text cell is HTML-escaped.
+"""
+
+import pandas as pd
+
+HTML_ESCAPES = [('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&quot;'), ("'", '&#x27;')]
+
+
+def _strings(values):
+    return values.astype('string').fillna('')
+
+
+def escape_html(values):
+    """HTML-escape a Series of text, like html.escape(value, quote=True)."""
+    values = _strings(values)
+    for char, entity in HTML_ESCAPES:  # & first, so entities aren't escaped twice
+        values = values.str.replace(char, entity, regex=False)
+    return values
+
+
+def format_thousands(values):
+    """Integers as text with thousands separators, e.g. 1234567 -> '1,234,567'."""
+    return values.astype('int64').astype('string').str.replace(r'\B(?=(\d{3})+(?!\d))', ',', regex=True)
+
+
+def link_cells(urls, width):
+    """
+    <a> tags for a Series of URLs, showing at most width characters of
+    each. Only http(s) URLs become links; anything else is shown as text.
+    """
+    urls = _strings(urls)
+    text = escape_html(urls.str.slice(0, width).where(urls.str.len() <= width, urls.str.slice(0, width) + '...'))
+    cells = '<a href="' + escape_html(urls) + '" target="_blank">' + text + '</a>'
+    return cells.where(urls.str.match(r'(?i)https?://'), text)
+
+
+def render_table(df, link_width=40, comma_columns=(), blank_zero_columns=()):
+    """
+    HTML for a small table. video_link becomes a shortened clickable
+    link, comma_columns get thousands separators (blank_zero_columns
+    show '-' where the value is not above zero) and text is escaped.
+    """
+    cells = {}
+    for col in df.columns:
+        values = df[col]
+        if col == 'video_link':
+            cells[col] = link_cells(values, link_width)
+        elif col in comma_columns:
+            formatted = format_thousands(values)
+            if col in blank_zero_columns:
+                formatted = formatted.where(values.astype('int64') > 0, '-')
+            cells[col] = formatted
+        elif values.dtype.kind in 'iuf':
+            cells[col] = values
+        else:
+            cells[col] = escape_html(values)
+    return pd.DataFrame(cells).to_html(escape=False, index=False)
@@ -0,0 +1,349 @@
+"""
+Query Service
+Local HTTP/JSON service that owns one in-memory copy of the dashboard
+data, kept fresh by a BackgroundRefresher, and answers summary, top-N,
+grouped and paged queries from the per-load FilterIndex, RollupCube and
+Ranking. Other tools get the dashboard's numbers without talking to
+Google Sheets themselves.
+
+Every response carries an ETag made from the data version and the
+query; a request whose If-None-Match matches gets 304 Not Modified
+without the query being run. Start it with:
+
+    python query_service.py [--host 127.0.0.1] [--port 8765]
+
+Endpoints (all GET, filters are platform/creator/sheet/source, repeatable):
+    /summary                totals, as in the dashboard's metric row
+    /top?metric=&n=&positive=   the n rows with the largest metric
+    /posts?sort=&page=&page_size=&ascending=   one page of rows
+    /groups?dimension=      metric sums per platform/creator/sheet/source
+    /filters                the values each filter accepts
+    /status                 data age, refresh state and per-source status
+and POST /refresh to start a refresh in the background.
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import urllib.error
+import urllib.request
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+import pandas as pd
+from figure_cache import BoundedCache
+from filter_index import FILTER_COLUMNS
+from ranking import Ranking
+from rollup import METRICS, RollupCube
+from schema import METRIC_COLUMNS
+from sheets_reader import BackgroundRefresher, DataCache, FilterIndex, load_snapshot, refresh_and_save
+from tracing import span
+from config import (
+    REFRESH_INTERVAL, QUERY_SERVICE_HOST, QUERY_SERVICE_PORT, QUERY_MAX_ROWS, QUERY_CACHE_BYTES,
+)
+
+# Columns returned for each row by /top and /posts
+ROW_COLUMNS = [
+    'source', 'sheet', 'content_creator', 'platform', 'video_link',
+    'reactions', 'comments', 'shares', 'views', 'engagement',
+]
+
+# Dimensions /groups accepts, keyed by their query name
+GROUP_DIMENSIONS = {'platform': 'platform', 'creator': 'content_creator', 'sheet': 'sheet', 'source': 'source'}
+
+
+class QueryError(ValueError):
+    """A query with a missing or invalid parameter (HTTP 400)."""
+
+
+def data_version(df):
+    """Content hash of a loaded DataFrame, the data part of every ETag."""
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.blake2b(hashes.tobytes(), digest_size=8).hexdigest()
+
+
+def _int_param(params, name, default, low=0, high=None):
+    value = params.get(name, [str(default)])[-1]
+    try:
+        value = int(value)
+    except ValueError:
+        raise QueryError(f"{name} must be an integer") from None
+    if value < low:
+        raise QueryError(f"{name} must be at least {low}")
+    if high is not None and value > high:
+        raise QueryError(f"{name} must be at most {high}")
+    return value
+
+
+def _bool_param(params, name):
+    return params.get(name, ['0'])[-1].lower() in ('1', 'true', 'yes')
+
+
+def _choice_param(params, name, choices, default):
+    value = params.get(name, [default])[-1]
+    if value not in choices:
+        raise QueryError(f"{name} must be one of {', '.join(choices)}")
+    return value
+
+
+def parse_filters(params):
+    """Filter arguments from query parameters: a value, a list of values or None."""
+    filters = {}
+    for arg in FILTER_COLUMNS:
+        values = params.get(arg)
+        filters[arg] = None if not values else values[0] if len(values) == 1 else values
+    return filters
+
+
+class QueryService:
+    """
+    Answers dashboard queries against a DataCache. Structures derived
+    from the data are built once per load via DataCache.derived() and
+    JSON responses are cached per data load and query.
+    """
+
+    def __init__(self, cache, refresher=None, cache_bytes=QUERY_CACHE_BYTES):
+        self.cache = cache
+        self.refresher = refresher
+        self.cache_bytes = cache_bytes
+
+    def _context(self):
+        """Current df and its version, index, cube, ranking and response cache."""
+        df = self.cache.df
+        derived = self.cache.derived
+        return {
+            'df': df,
+            'version': derived('data_version', data_version, df),
+            'index': derived('filter_index', FilterIndex, df),
+            'cube': derived('rollup', RollupCube, df),
+            'ranking': derived('ranking', Ranking, df),
+            'responses': derived('query_responses', lambda df: BoundedCache(self.cache_bytes), df),
+        }
+
+    def _rows(self, df, positions):
+        return df.take(positions)[ROW_COLUMNS].to_dict('records')
+
+    def summary(self, context, params):
+        filters = parse_filters(params)
+        if any(value is not None for value in filters.values()):
+            totals = context['cube'].totals(context['cube'].select(**filters))
+        else:
+            totals = self.cache.summary(context['df'])
+        return dict(totals)
+
+    def top(self, context, params):
+        metric = _choice_param(params, 'metric', METRIC_COLUMNS, 'engagement')
+        n = _int_param(params, 'n', 10, 1, QUERY_MAX_ROWS)
+        positions = context['index'].positions(**parse_filters(params))
+        top = context['ranking'].top(metric, positions, n, positive=_bool_param(params, 'positive'))
+        return {'metric': metric, 'rows': self._rows(context['df'], top)}
+
+    def posts(self, context, params):
+        metric = _choice_param(params, 'sort', METRIC_COLUMNS, 'engagement')
+        page = _int_param(params, 'page', 1, 1)
+        page_size = _int_param(params, 'page_size', 50, 1, QUERY_MAX_ROWS)
+        positions = context['index'].positions(**parse_filters(params))
+        page_positions, total = context['ranking'].page(
+            metric, positions, page - 1, page_size, ascending=_bool_param(params, 'ascending'),
+        )
+        return {
+            'sort': metric, 'page': page, 'page_size': page_size, 'total': int(total),
+            'rows': self._rows(context['df'], page_positions),
+        }
+
+    def groups(self, context, params):
+        dimension = _choice_param(params, 'dimension', list(GROUP_DIMENSIONS), 'platform')
+        cube = context['cube']
+        grouped = cube.group(GROUP_DIMENSIONS[dimension], cube.select(**parse_filters(params)))
+        grouped = grouped[grouped['posts'] > 0][METRICS]
+        return {
+            'dimension': dimension,
+            'groups': [
+                {'value': str(value), **{metric: int(row[metric]) for metric in METRICS}}
+                for value, row in grouped.iterrows()
+            ],
+        }
+
+    def filters(self, context, params):
+        return {arg: sorted(map(str, context['index'].values(arg))) for arg in FILTER_COLUMNS}
+
+    # Data queries, answered per data version and so safe to cache
+    QUERIES = {'/summary': summary, '/top': top, '/posts': posts, '/groups': groups, '/filters': filters}
+
+    def status(self):
+        """Refresher status (or just the data age) in JSON-friendly form."""
+        if self.refresher is not None:
+            status = self.refresher.status()
+        else:
+            status = {'check_age': self.cache.age(), 'sources': self.cache.source_status()}
+        status = dict(status, sources=[
+            dict(source, last_error=None if source['last_error'] is None else str(source['last_error']))
+            for source in status['sources']
+        ])
+        if status.get('last_error') is not None:
+            status['last_error'] = str(status['last_error'])
+        return status
+
+    def query(self, path, params, if_none_match=None):
+        """
+        Run a data query. Returns (status, etag, body): body is the JSON
+        text, or None for a 304 when if_none_match matches the ETag.
+        Raises KeyError for an unknown path and QueryError for bad parameters.
+        """
+        handler = self.QUERIES[path]
+        context = self._context()
+        canonical = urlencode(sorted((k, v) for k, values in params.items() for v in values))
+        key = f"{path}?{canonical}"
+        etag = '"%s-%s"' % (context['version'], hashlib.blake2b(key.encode(), digest_size=8).hexdigest())
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(',')]:
+            return HTTPStatus.NOT_MODIFIED, etag, None
+
+        with span('query', path=path):
+            body = context['responses'].get(
+                key, lambda: json.dumps(handler(self, context, params), default=_json_default),
+            )
+        return HTTPStatus.OK, etag, body
+
+
+def _json_default(value):
+    """NumPy scalars and other stragglers json can't encode."""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """Routes requests to the server's QueryService."""
+
+    server_version = 'EngagementQuery/1.0'
+
+    def _send(self, status, body=None, etag=None):
+        payload = b'' if body is None else body.encode('utf-8')
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')  # Always revalidate, the ETag makes it cheap
+        if body is not None:
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if payload:
+            self.wfile.write(payload)
+
+    def _error(self, status, message):
+        self._send(status, json.dumps({'error': message}))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        service = self.server.service
+        if url.path != '/status' and url.path not in service.QUERIES:
+            return self._error(HTTPStatus.NOT_FOUND, f"Unknown endpoint {url.path}")
+        try:
+            if url.path == '/status':
+                return self._send(HTTPStatus.OK, json.dumps(service.status(), default=_json_default))
+            status, etag, body = service.query(url.path, parse_qs(url.query), self.headers.get('If-None-Match'))
+        except QueryError as e:
+            return self._error(HTTPStatus.BAD_REQUEST, str(e))
+        except Exception as e:
+            # Answer instead of dropping the connection; the server stays up
+            return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}")
+        self._send(status, body, etag)
+
+    def do_POST(self):
+        service = self.server.service
+        if urlsplit(self.path).path != '/refresh':
+            return self._error(HTTPStatus.NOT_FOUND, f"Unknown endpoint {self.path}")
+        if service.refresher is None:
+            return self._error(HTTPStatus.CONFLICT, "This service has no background refresher")
+        service.refresher.trigger()
+        self._send(HTTPStatus.ACCEPTED, json.dumps({'refreshing': True}))
+
+    def log_message(self, format, *args):
+        pass  # Keep the console quiet; requests are traced instead
+
+
+def make_server(service, host=QUERY_SERVICE_HOST, port=QUERY_SERVICE_PORT):
+    """A threading HTTP server answering from service (port 0 picks a free port)."""
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+class QueryClient:
+    """
+    Minimal client for the query service. Remembers each response with
+    its ETag and revalidates with If-None-Match, so unchanged results
+    come back as an empty 304.
+    """
+
+    def __init__(self, base_url=None, timeout=10):
+        self.base_url = (base_url or f"http://{QUERY_SERVICE_HOST}:{QUERY_SERVICE_PORT}").rstrip('/')
+        self.timeout = timeout
+        self.responses = {}
+        self.not_modified = 0
+        self.lock = threading.Lock()
+
+    def get(self, path, **params):
+        """GET path with query params (None values dropped, lists repeated); returns the decoded JSON."""
+        query = urlencode([
+            (k, v) for k, value in sorted(params.items()) if value is not None
+            for v in (value if isinstance(value, (list, tuple)) else [value])
+        ])
+        url = f"{self.base_url}{path}?{query}" if query else f"{self.base_url}{path}"
+        with self.lock:
+            cached = self.responses.get(url)
+        request = urllib.request.Request(url)
+        if cached is not None:
+            request.add_header('If-None-Match', cached[0])
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data = json.loads(response.read())
+                etag = response.headers.get('ETag')
+        except urllib.error.HTTPError as e:
+            if e.code != HTTPStatus.NOT_MODIFIED or cached is None:
+                raise
+            with self.lock:
+                self.not_modified += 1
+            return cached[1]
+        if etag:
+            with self.lock:
+                self.responses[url] = (etag, data)
+        return data
+
+    def summary(self, **filters):
+        return self.get('/summary', **filters)
+
+    def top(self, metric='engagement', n=10, positive=False, **filters):
+        return self.get('/top', metric=metric, n=n, positive=int(positive), **filters)['rows']
+
+    def posts(self, sort='engagement', page=1, page_size=50, ascending=False, **filters):
+        return self.get('/posts', sort=sort, page=page, page_size=page_size, ascending=int(ascending), **filters)
+
+    def groups(self, dimension='platform', **filters):
+        return self.get('/groups', dimension=dimension, **filters)['groups']
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve the dashboard data as JSON.")
+    parser.add_argument('--host', default=QUERY_SERVICE_HOST)
+    parser.add_argument('--port', type=int, default=QUERY_SERVICE_PORT)
+    args = parser.parse_args()
+
+    # Same start-up as the dashboard: snapshot first, then keep refreshing
+    cache = load_snapshot() or DataCache()
+    refresher = BackgroundRefresher(cache, interval=REFRESH_INTERVAL)
+    refresher.start(immediate=cache.loaded_at is not None)
+    if cache.loaded_at is None:
+        refresh_and_save(cache)
+
+    server = make_server(QueryService(cache, refresher), args.host, args.port)
+    print(f"Query service on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        refresher.stop()
+        server.server_close()
@@ -0,0 +1,88 @@
+"""
+Ranking
+Presorted orderings per metric, built once per data load and shared by
+the "Top 10" panels and the All Posts table. A top-N query for a filter
+only looks at the filtered rows' ranks instead of re-sorting the frame.
+"""
+
+import numpy as np
+
+
+class Ranking:
+    """Descending order and rank of every row, per metric column."""
+
+    def __init__(self, df):
+        self.df = df
+        self._orders = {}
+        self._ranks = {}
+
+    def _build(self, metric):
+        values = self.df[metric].to_numpy().astype('int64')
+        dtype = np.int32 if len(values) < 2 ** 31 else np.int64
+        # Stable sort, so ties keep row order like nlargest(keep='first')
+        order = np.argsort(-values, kind='stable').astype(dtype)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order), dtype=dtype)
+        self._orders[metric] = order
+        self._ranks[metric] = rank
+
+    def order(self, metric):
+        """Row positions sorted by metric, largest first."""
+        if metric not in self._orders:
+            self._build(metric)
+        return self._orders[metric]
+
+    def rank(self, metric):
+        """Position of each row within order(metric)."""
+        if metric not in self._ranks:
+            self._build(metric)
+        return self._ranks[metric]
+
+    def _smallest(self, keys, k):
+        """Indices of the k smallest keys, in ascending key order."""
+        if k < len(keys):
+            part = np.argpartition(keys, k - 1)[:k]
+        else:
+            part = np.arange(len(keys))
+        return part[np.argsort(keys[part], kind='stable')]
+
+    def top(self, metric, positions=None, n=10, positive=False):
+        """
+        Positions of the n rows with the largest metric, largest first.
+        positions restricts the search (None means every row); positive
+        drops rows whose metric is not above zero.
+        """
+        if positions is None:
+            result = self.order(metric)[:n]
+        else:
+            positions = np.asarray(positions)
+            result = positions[self._smallest(self.rank(metric)[positions], n)]
+
+        if positive:
+            result = result[self.df[metric].to_numpy()[result] > 0]
+        return result
+
+    def top_rows(self, metric, positions=None, n=10, positive=False):
+        """Like top(), but returns the rows themselves."""
+        return self.df.take(self.top(metric, positions, n, positive))
+
+    def page(self, metric, positions=None, page=0, page_size=50, ascending=False):
+        """
+        One page of rows sorted by metric.
+        Returns (positions for the page, total number of matching rows).
+        """
+        start = page * page_size
+        stop = start + page_size
+
+        if positions is None:
+            order = self.order(metric)
+            total = len(order)
+            if ascending:
+                order = order[::-1]
+            return order[start:stop], total
+
+        positions = np.asarray(positions)
+        keys = self.rank(metric)[positions]
+        if ascending:
+            keys = -keys
+        return positions[self._smallest(keys, stop)][start:stop], len(positions)
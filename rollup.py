@@ -0,0 +1,109 @@
+"""
+Rollup Cube
+Pre-aggregated sums and counts by (source, sheet, platform, creator),
+built once per data load. Dashboard aggregations are answered from the
+cube, so their cost depends on the number of groups rather than the
+number of rows.
+"""
+
+import numpy as np
+import pandas as pd
+from schema import METRIC_COLUMNS
+from summary import Summary
+
+DIMENSIONS = ['source', 'sheet', 'platform', 'content_creator']
+
+METRICS = ['posts', 'reactions', 'comments', 'shares', 'views', 'engagement']
+
+# posts/views restricted to rows with views > 0, for the views sections
+VIEWED_METRICS = ['viewed_posts', 'viewed_views']
+
+# Filter arguments accepted by RollupCube.select(), keyed to their column
+FILTERS = {'platform': 'platform', 'creator': 'content_creator', 'sheet': 'sheet', 'source': 'source'}
+
+
+class RollupCube:
+    """Sums and counts per (source, sheet, platform, content_creator) group."""
+
+    def __init__(self, df):
+        if df.empty:
+            self.cube = pd.DataFrame(columns=DIMENSIONS + METRICS + VIEWED_METRICS)
+            return
+
+        views = df['views'].astype('int64')
+        work = pd.DataFrame({
+            'source': df['source'],
+            'sheet': df['sheet'],
+            'platform': df['platform'],
+            'content_creator': df['content_creator'],
+            'posts': 1,
+            'reactions': df['reactions'].astype('int64'),
+            'comments': df['comments'].astype('int64'),
+            'shares': df['shares'].astype('int64'),
+            'views': views,
+            'engagement': df['engagement'].astype('int64'),
+            'viewed_posts': (views > 0).astype('int64'),
+            'viewed_views': views.where(views > 0, 0),
+        })
+        self.cube = (
+            work.groupby(DIMENSIONS, observed=True, sort=False, dropna=False)
+            .sum()
+            .reset_index()
+        )
+
+    def __len__(self):
+        return len(self.cube)
+
+    def select(self, platform=None, creator=None, sheet=None, source=None):
+        """
+        Cube rows matching a filter. Each argument is None (no filter),
+        a single value, or a list of allowed values.
+        """
+        rows = self.cube
+        for arg, value in (('platform', platform), ('creator', creator), ('sheet', sheet), ('source', source)):
+            if value is None:
+                continue
+            column = rows[FILTERS[arg]]
+            if isinstance(value, (list, tuple, set)):
+                rows = rows[column.isin(value)]
+            else:
+                rows = rows[column == value]
+        return rows
+
+    def totals(self, rows=None):
+        """Summary of the selected rows; creator counts are only grouped when read."""
+        if rows is None:
+            rows = self.cube
+
+        platforms = rows.groupby('platform', observed=True)['posts'].sum()
+        return Summary(
+            rows['posts'].sum(),
+            np.array([rows[col].sum() for col in METRIC_COLUMNS], dtype=np.int64),
+            platforms.to_dict(),
+            lambda: rows.groupby('content_creator', observed=True)['posts'].sum().to_dict(),
+        )
+
+    def group(self, dimension, rows=None):
+        """Metric sums for the selected rows, one row per value of dimension."""
+        if rows is None:
+            rows = self.cube
+        return (
+            rows.groupby(dimension, observed=True, dropna=False)[METRICS + VIEWED_METRICS]
+            .sum()
+        )
+
+    def top(self, dimension, metric, n=10, rows=None, skip_blank=True):
+        """The n largest groups of dimension by metric."""
+        grouped = self.group(dimension, rows)
+        if skip_blank:
+            grouped = grouped[grouped.index.astype(str).str.strip() != '']
+        return grouped.sort_values(metric, ascending=False).head(n)
+
+    def viewed(self, rows=None, platform=None):
+        """Rows with at least one post that has views, optionally for one platform."""
+        if rows is None:
+            rows = self.cube
+        mask = rows['viewed_posts'] > 0
+        if platform is not None:
+            mask &= rows['platform'] == platform
+        return rows[mask]
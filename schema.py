@@ -0,0 +1,130 @@
+"""
+DataFrame Schema
+Compact dtypes for the engagement DataFrame built by sheets_reader.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from config import ARROW_STRINGS
+
+# Low-cardinality text columns, stored as categoricals
+CATEGORY_COLUMNS = ['source', 'sheet', 'content_creator', 'platform']
+
+# Count columns, stored in the smallest integer type that holds them
+METRIC_COLUMNS = ['reactions', 'comments', 'shares', 'views', 'engagement']
+
+# Mostly distinct text columns, stored Arrow-backed when ARROW_STRINGS is on
+STRING_COLUMNS = ['video_link', 'video_key']
+
+UNSIGNED_TYPES = [np.uint8, np.uint16, np.uint32, np.uint64]
+SIGNED_TYPES = [np.int8, np.int16, np.int32, np.int64]
+
+
+def smallest_int_dtype(values):
+    """Smallest integer dtype that can hold every value (unsigned if none are negative)."""
+    if values.empty:
+        return np.dtype(np.uint8)
+
+    low, high = values.min(), values.max()
+    candidates = UNSIGNED_TYPES if low >= 0 else SIGNED_TYPES
+    for dtype in candidates:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return values.dtype  # Python ints beyond 64 bits stay as they are
+
+
+def apply_schema(df, arrow_strings=None):
+    """
+    Return df with compact dtypes: categoricals for source/sheet/creator/platform,
+    minimal integer widths for the metrics and (optionally) an Arrow-backed
+    string dtype for video_link and video_key.
+
+    Note: narrow unsigned columns wrap around on subtraction; cast to int64
+    before doing arithmetic on them.
+    """
+    if arrow_strings is None:
+        arrow_strings = ARROW_STRINGS
+
+    columns = {}
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            columns[col] = df[col].astype('category')
+
+    for col in METRIC_COLUMNS:
+        if col in df.columns and df[col].dtype.kind in 'iu':
+            dtype = smallest_int_dtype(df[col])
+            if dtype != df[col].dtype:
+                columns[col] = df[col].astype(dtype)
+
+    if arrow_strings:
+        try:
+            for col in STRING_COLUMNS:
+                if col in df.columns:
+                    columns[col] = df[col].astype('string[pyarrow]')
+        except ImportError:
+            pass  # pyarrow not installed, keep the default string dtype
+
+    if not columns:
+        return df
+    return df.assign(**columns)
+
+
+def concat_typed(frames):
+    """
+    Concatenate frames that already went through apply_schema() without
+    widening them back to object columns: categoricals are merged with
+    union_categoricals and the result is re-narrowed by apply_schema().
+    Returns None when every frame is empty.
+    """
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return None
+
+    columns = {}
+    for col in frames[0].columns:
+        parts = [frame[col] for frame in frames]
+        try:
+            if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+                columns[col] = pd.Series(union_categoricals(parts, sort_categories=True, ignore_order=True))
+                continue
+        except TypeError:
+            parts = [part.astype(object) for part in parts]  # Mixed category dtypes
+        columns[col] = pd.concat(parts, ignore_index=True)
+    return apply_schema(pd.DataFrame(columns))
+
+
+def memory_usage(df):
+    """
+    Deep memory use of df in bytes, per column plus a 'total' entry,
+    alongside what the same data costs with plain object/int64 columns.
+    """
+    actual = df.memory_usage(index=True, deep=True)
+
+    baseline = df.copy()
+    for col in baseline.columns:
+        if baseline[col].dtype.kind in 'iu':
+            baseline[col] = baseline[col].astype('int64')
+        elif baseline[col].dtype.kind != 'f':
+            baseline[col] = baseline[col].astype(object)
+    plain = baseline.memory_usage(index=True, deep=True)
+
+    report = {
+        col: {'bytes': int(actual[col]), 'plain_bytes': int(plain[col]), 'dtype': str(df[col].dtype)}
+        for col in df.columns
+    }
+    report['total'] = {
+        'bytes': int(actual.sum()),
+        'plain_bytes': int(plain.sum()),
+        'dtype': '',
+    }
+    return report
+
+
+def format_memory_report(report):
+    """Render memory_usage() output as a small text table."""
+    lines = [f"{'column':18s} {'dtype':16s} {'bytes':>12s} {'plain':>12s}"]
+    for col, row in report.items():
+        lines.append(f"{col:18s} {row['dtype']:16s} {row['bytes']:12,d} {row['plain_bytes']:12,d}")
+    return '\n'.join(lines)
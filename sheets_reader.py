@@ -4,45 +4,40 @@ Reads engagement data from Google Sheets for the dashboard.
 Supports both local credentials.json and Streamlit Cloud secrets.
 """
 
-import gspread
-from google.oauth2.service_account import Credentials
+import numpy as np
+import itertools
+from gspread.utils import a1_to_rowcol, absolute_range_name, fill_gaps, rowcol_to_a1
 import pandas as pd
+import hashlib
+import json
 import os
 import re
-from config import SHEET_ID, SCOPES, CREDENTIALS_FILE, EXCLUDED_SHEETS
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote
+from config import (
+    SHEET_ID, EXCLUDED_SHEETS, SPREADSHEETS,
+    BATCH_FETCH, BATCH_GET_MAX_TABS, BATCH_GET_MAX_URL_LENGTH, PROJECTED_FETCH,
+    REFRESH_INTERVAL, SNAPSHOT_FILE, SHEET_SCHEMAS, DEDUPE_VIDEOS, HISTORY_DB,
+)
+from schema import CATEGORY_COLUMNS, apply_schema, concat_typed, memory_usage, format_memory_report
+from filter_index import FilterIndex
+from fetch_scheduler import default_bucket, run_concurrently
+from client_manager import default_manager
+from video_urls import duplicate_videos, video_keys
+from history import record_snapshot
+from summary import Summary, summarize
+from tracing import default_tracer, format_summary, span
 
 
 def get_client():
     """
     Get authenticated Google Sheets client.
-    Supports:
-    1. Streamlit Cloud secrets (st.secrets["gcp_service_account"])
-    2. Local credentials.json file
+    The client is cached for the whole process (see client_manager), so
+    repeated calls reuse its credentials and pooled HTTP session.
     """
-    # Try Streamlit secrets first (for Streamlit Cloud deployment)
-    try:
-        import streamlit as st
-        if hasattr(st, 'secrets') and "gcp_service_account" in st.secrets:
-            creds = Credentials.from_service_account_info(
-                st.secrets["gcp_service_account"],
-                scopes=SCOPES
-            )
-            client = gspread.authorize(creds)
-            return client
-    except Exception:
-        pass  # Fall back to local credentials
-
-    # Fall back to local credentials.json
-    if not os.path.exists(CREDENTIALS_FILE):
-        raise FileNotFoundError(
-            f"credentials.json not found!\n\n"
-            f"Please copy credentials.json from fb_video_scraper project,\n"
-            f"or configure Streamlit Cloud secrets."
-        )
-
-    creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
-    client = gspread.authorize(creds)
-    return client
+    return default_manager().get()
 
 
 def detect_platform(url):
@@ -108,6 +103,86 @@ def find_columns(header_row):
     return columns
 
 
+# Fields find_columns() maps to column positions
+COLUMN_FIELDS = list(find_columns([]))
+
+
+def find_header_row(all_values):
+    """Index of the first row mentioning a link or URL, or None."""
+    for idx, row in enumerate(all_values):
+        row_text = ' '.join(row).lower()
+        if 'link' in row_text or 'url' in row_text:
+            return idx
+    return None
+
+
+def configured_layout(title):
+    """
+    The SHEET_SCHEMAS override for a tab as (header_row_idx, columns),
+    or None when the tab has no override.
+    """
+    schema = SHEET_SCHEMAS.get(title)
+    if schema is None:
+        return None
+
+    columns = dict.fromkeys(COLUMN_FIELDS)
+    for field, letter in schema.get('columns', {}).items():
+        if field not in columns:
+            raise ValueError(f"Unknown column {field!r} in SHEET_SCHEMAS[{title!r}]")
+        columns[field] = a1_to_rowcol(f"{letter}1")[1] - 1
+    return schema.get('header_row', 1) - 1, columns
+
+
+def header_fingerprint(rows):
+    """
+    Hash of the rows up to and including the header. Trailing empty cells
+    are ignored, so padded (get_all_values) and trimmed (batchGet) rows
+    give the same fingerprint.
+    """
+    return hash_values([_trim(row) for row in rows])
+
+
+def _trim(cells):
+    """cells without its trailing empty cells."""
+    end = len(cells)
+    while end and cells[end - 1] == '':
+        end -= 1
+    return cells[:end]
+
+
+# Detected layout per (spreadsheet ID, tab title): (header_row_idx, header fingerprint, columns)
+_layouts = {}
+_layouts_lock = threading.Lock()
+
+
+def sheet_layout(title, all_values, sheet_id=SHEET_ID):
+    """
+    Header row index and column mapping for a tab of spreadsheet sheet_id.
+    Uses the SHEET_SCHEMAS override when there is one, otherwise the
+    layout detected on an earlier load as long as the rows up to its
+    header are unchanged. Only new or edited headers are detected again.
+    """
+    layout = configured_layout(title)
+    if layout is not None:
+        return layout
+
+    cached = _layouts.get((sheet_id, title))
+    if cached is not None:
+        header_row_idx, fingerprint, columns = cached
+        if header_row_idx < len(all_values) and header_fingerprint(all_values[:header_row_idx + 1]) == fingerprint:
+            return header_row_idx, columns
+
+    header_row_idx = find_header_row(all_values)
+    if header_row_idx is None:
+        return 0, find_columns(all_values[0])  # No header found, nothing worth caching
+
+    columns = find_columns(all_values[header_row_idx])
+    fingerprint = header_fingerprint(all_values[:header_row_idx + 1])
+    with _layouts_lock:
+        _layouts[(sheet_id, title)] = (header_row_idx, fingerprint, columns)
+    return header_row_idx, columns
+
+
 def parse_number(value):
     """Parse a number from string, handling K/M suffixes."""
     if not value:
@@ -132,119 +207,1011 @@ def parse_number(value):
         return 0
 
 
-def read_all_data():
+# Platform rules in detect_platform() order: (name, URL substrings)
+PLATFORM_PATTERNS = [
+    ('Facebook', ('facebook.com', 'fb.com')),
+    ('Instagram', ('instagram.com',)),
+    ('TikTok', ('tiktok.com',)),
+    ('YouTube', ('youtube.com', 'youtu.be')),
+]
+
+# Plain decimal numbers that float() and a bulk float cast agree on
+DECIMAL_PATTERN = r'[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?'
+
+# Below this many cells, number parsing calls parse_number() once per
+# distinct cell: the bulk string operations cost more in fixed per-call
+# overhead than they save on tabs of a few thousand rows
+VECTORIZE_MIN_CELLS = 20_000
+
+
+def detect_platforms(urls):
+    """detect_platform() for a Series of URLs, run once per distinct URL."""
+    codes, uniques = pd.factorize(urls)
+    # The trailing 'Unknown' is what missing URLs (code -1) pick up
+    names = np.array([detect_platform(url) for url in uniques] + ['Unknown'], dtype=object)
+    return pd.Series(names[codes], index=urls.index, dtype=str)
+
+
+def _parse_cells(cells):
+    """parse_number() over a list of cell strings, as an array."""
+    # Formatted counts ('1.2M', '45.3K') repeat a lot, so parse each once
+    parsed = {cell: parse_number(cell) for cell in set(cells)}
+    numbers = [parsed[cell] for cell in cells]
+    if any(abs(v) >= 2 ** 63 for v in parsed.values()):
+        return np.array(numbers, dtype=object)  # Too big for int64
+    return np.array(numbers, dtype='int64')
+
+
+def parse_numbers(values):
     """
-    Read all engagement data from all sheets.
-    Returns a pandas DataFrame with all data.
+    parse_number() for a Series of cell strings, vectorized for large
+    inputs. Cells the fast path can't convert go through parse_number(),
+    so the results always match the scalar version.
     """
-    client = get_client()
-    spreadsheet = client.open_by_key(SHEET_ID)
-    sheets = spreadsheet.worksheets()
+    result = np.zeros(len(values), dtype='int64')
+    if values.empty:
+        return pd.Series(result, index=values.index)
+    if len(values) < VECTORIZE_MIN_CELLS:
+        return pd.Series(_parse_cells(values.fillna('').tolist()), index=values.index)
 
-    all_data = []
+    text = values.fillna('').astype(str).str.strip().str.replace(',', '', regex=False)
 
-    for sheet in sheets:
-        # Skip excluded sheets
-        if sheet.title in EXCLUDED_SHEETS:
-            continue
+    # Handle K (thousands) and M (millions) suffixes
+    suffix = text.str[-1:]
+    is_thousands = suffix.isin(['K', 'k']).to_numpy(dtype=bool)
+    is_millions = suffix.isin(['M', 'm']).to_numpy(dtype=bool)
+    digits = text.where(~(is_thousands | is_millions), text.str[:-1])
+    multiplier = np.where(is_thousands, 1000, np.where(is_millions, 1000000, 1))
 
-        all_values = sheet.get_all_values()
+    number = np.full(len(values), np.nan)
+    is_decimal = digits.str.fullmatch(DECIMAL_PATTERN).to_numpy(dtype=bool, na_value=False)
+    number[is_decimal] = digits[is_decimal].astype('float64').to_numpy()
+    scaled = number * multiplier
+    fast = np.isfinite(scaled) & (np.abs(scaled) < 2 ** 63)
+    result[fast] = np.trunc(scaled[fast])
 
-        if len(all_values) < 2:
-            continue
-
-        # Find header row
-        header_row_idx = 0
-        for idx, row in enumerate(all_values):
-            row_text = ' '.join(row).lower()
-            if 'link' in row_text or 'url' in row_text:
-                header_row_idx = idx
-                break
+    # Anything else that isn't blank gets the scalar treatment
+    slow = ~fast & (text != '').to_numpy(dtype=bool)
+    result = pd.Series(result, index=values.index)
+    if slow.any():
+        slow_values = [parse_number(v) for v in values[slow]]
+        if any(abs(v) >= 2 ** 63 for v in slow_values):
+            result = result.astype(object)  # Too big for int64, as in the scalar path
+        result[slow] = slow_values
+    return result
 
-        # Auto-detect columns
-        header_row = all_values[header_row_idx]
-        columns = find_columns(header_row)
 
-        if columns.get('video_link') is None:
-            continue
+# Columns of the DataFrame returned by parse_sheet()
+COLUMNS = [
+    'sheet', 'content_creator', 'video_link', 'platform',
+    'reactions', 'comments', 'shares', 'views', 'engagement',
+]
 
-        # Process data rows
-        for row in all_values[header_row_idx + 1:]:
-            if len(row) <= columns['video_link']:
-                continue
+# Columns of the frames parse_tab() returns and of read_all_data() (after 'source')
+FRAME_COLUMNS = COLUMNS + ['video_key']
 
-            video_link = row[columns['video_link']] if columns['video_link'] is not None else ''
 
-            # Skip empty rows
-            if not video_link or not video_link.strip():
-                continue
+class ProjectedValues:
+    """
+    A tab fetched as its header rows plus only the mapped columns, in
+    place of the full grid. columns maps each mapped find_columns() field
+    to that column's cells below the header.
+    """
+
+    def __init__(self, header_rows, columns):
+        self.header_rows = header_rows
+        self.columns = columns
+
+    def __len__(self):
+        return max((len(values) for values in self.columns.values()), default=0)
+
+    def padded(self):
+        """The mapped columns, padded with empty cells to equal length."""
+        length = len(self)
+        return {field: values + [''] * (length - len(values)) for field, values in self.columns.items()}
+
+
+def known_layout(title, sheet_id=SHEET_ID):
+    """
+    (header_row_idx, fingerprint, columns) for a tab whose layout is
+    already known, or None. Layouts from SHEET_SCHEMAS have no fingerprint.
+    """
+    layout = configured_layout(title)
+    if layout is not None:
+        return layout[0], None, layout[1]
+    return _layouts.get((sheet_id, title))
+
+
+def _column_letter(idx):
+    return re.sub(r'\d', '', rowcol_to_a1(1, idx + 1))
+
+
+def _tab_ranges(title, layout):
+    """
+    A1 ranges to fetch for a tab: the whole tab when its layout is not
+    known, otherwise the header rows (when there is a fingerprint to
+    check) and each mapped column below the header.
+    """
+    if layout is None:
+        return [absolute_range_name(title)]
+
+    header_row_idx, fingerprint, columns = layout
+    ranges = []
+    if fingerprint is not None:
+        ranges.append(absolute_range_name(title, f"1:{header_row_idx + 1}"))
+    first_row = header_row_idx + 2
+    for idx in columns.values():
+        if idx is not None:
+            letter = _column_letter(idx)
+            ranges.append(absolute_range_name(title, f"{letter}{first_row}:{letter}"))
+    return ranges
 
-            # Skip non-video URLs
-            if 'http' not in video_link.lower():
+
+def _plan_tab(title, project, sheet_id=SHEET_ID):
+    """The known layout to project a tab's fetch on, or None for a full fetch."""
+    layout = known_layout(title, sheet_id) if project else None
+    if layout is None or layout[2].get('video_link') is None:
+        return None
+    return layout
+
+
+def _chunk_titles(titles, max_tabs=None, project=False, sheet_id=SHEET_ID):
+    """Split tab titles into batches that fit in a single batchGet request."""
+    max_tabs = max_tabs or BATCH_GET_MAX_TABS
+    chunks = []
+    current = []
+    current_length = 0
+
+    for title in titles:
+        # Each range is sent as its own URL-encoded "ranges=" query parameter
+        range_length = sum(
+            len(quote(range_name)) + len('&ranges=')
+            for range_name in _tab_ranges(title, _plan_tab(title, project, sheet_id))
+        )
+        if current and (
+            len(current) >= max_tabs
+            or current_length + range_length > BATCH_GET_MAX_URL_LENGTH
+        ):
+            chunks.append(current)
+            current = []
+            current_length = 0
+        current.append(title)
+        current_length += range_length
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _header_rows(columns, count):
+    """Rebuild count rows from column-major cells (trailing cells trimmed)."""
+    return [[column[row] if row < len(column) else '' for column in columns] for row in range(count)]
+
+
+def _batch_get_chunk(spreadsheet, titles, project=False):
+    """
+    values:batchGet for a chunk of tabs. Tabs whose layout is not known
+    come back whole, in one request. With project, the others come back
+    as ProjectedValues from a second, column-major request (one list per
+    column rather than one per cell); any whose header rows no longer
+    match are fetched again in full.
+    """
+    with span('fetch.batch', tabs=len(titles)) as attrs:
+        tabs = _batch_get_tabs(spreadsheet, titles, project, attrs)
+        attrs['rows'] = sum(len(values) for _, values in tabs)
+    return tabs
+
+
+def _batch_get_tabs(spreadsheet, titles, project, attrs):
+    plans = [(title, _plan_tab(title, project, spreadsheet.id)) for title in titles]
+    full = [title for title, layout in plans if layout is None]
+    projected = [(title, layout) for title, layout in plans if layout is not None]
+    attrs['projected'] = len(projected)
+
+    tabs = []
+    if full:
+        response = spreadsheet.values_batch_get([absolute_range_name(title) for title in full])
+        # batchGet trims trailing empty cells, get_all_values() pads them
+        tabs.extend(
+            (title, fill_gaps(value_range.get('values', [])))
+            for title, value_range in zip(full, response.get('valueRanges', []))
+        )
+    if not projected:
+        return tabs
+
+    ranges = [range_name for title, layout in projected for range_name in _tab_ranges(title, layout)]
+    response = spreadsheet.values_batch_get(ranges, params={'majorDimension': 'COLUMNS'})
+    value_ranges = iter(response.get('valueRanges', []))
+
+    stale = []
+    for title, layout in projected:
+        parts = [
+            value_range.get('values', [])
+            for value_range in itertools.islice(value_ranges, len(_tab_ranges(title, layout)))
+        ]
+        header_row_idx, fingerprint, columns = layout
+        header_rows = []
+        if fingerprint is not None:
+            header_rows = _header_rows(parts.pop(0), header_row_idx + 1)
+            if header_fingerprint(header_rows) != fingerprint:
+                stale.append(title)
                 continue
 
-            content_creator = row[columns['content_creator']] if columns['content_creator'] is not None and len(row) > columns['content_creator'] else ''
-            reactions = parse_number(row[columns['reactions']]) if columns['reactions'] is not None and len(row) > columns['reactions'] else 0
-            comments = parse_number(row[columns['comments']]) if columns['comments'] is not None and len(row) > columns['comments'] else 0
-            shares = parse_number(row[columns['shares']]) if columns['shares'] is not None and len(row) > columns['shares'] else 0
-            views = parse_number(row[columns['views']]) if columns['views'] is not None and len(row) > columns['views'] else 0
+        mapped = [field for field, idx in columns.items() if idx is not None]
+        tabs.append((title, ProjectedValues(header_rows, {
+            field: part[0] if part else []
+            for field, part in zip(mapped, parts)
+        })))
 
-            platform = detect_platform(video_link)
-            engagement = reactions + comments + shares
+    if stale:
+        # The header moved or changed: fetch those tabs whole and re-detect.
+        # This runs inside the chunk's own retries, so it only takes a
+        # token from the rate limiter rather than retrying by itself.
+        attrs['stale'] = len(stale)
+        default_bucket().acquire()
+        tabs.extend(_batch_get_chunk(spreadsheet, stale))
+    return tabs
 
-            all_data.append({
-                'sheet': sheet.title,
-                'content_creator': content_creator,
-                'video_link': video_link.strip(),
-                'platform': platform,
-                'reactions': reactions,
-                'comments': comments,
-                'shares': shares,
-                'views': views,
-                'engagement': engagement,
-            })
 
-    df = pd.DataFrame(all_data)
+def included_worksheets(spreadsheet, worksheets=None, excluded=None):
+    """The spreadsheet's tabs minus excluded (default EXCLUDED_SHEETS)."""
+    if excluded is None:
+        excluded = EXCLUDED_SHEETS
+    if worksheets is None:
+        with span('sheets.worksheets'):
+            worksheets = spreadsheet.worksheets()
+    return [ws for ws in worksheets if ws.title not in excluded]
 
-    # Ensure 'views' column exists even if no views data found
-    if 'views' not in df.columns:
-        df['views'] = 0
 
-    return df
+def iter_sheet_values(spreadsheet, worksheets=None, batch=None, max_tabs=None, project=None):
+    """
+    Yield (title, all_values) for each of worksheets (default: every
+    non-excluded tab) as soon as it arrives, so callers can parse one tab
+    while others are in flight.
 
+    With batch (default BATCH_FETCH) tabs are fetched with values:batchGet,
+    one request per chunk of up to max_tabs tabs; otherwise with one
+    get_all_values() call per tab. Either way requests go through the
+    fetch scheduler's thread pool, rate limiter and retries. Yield order
+    is arrival order.
 
-def get_summary_stats(df):
-    """Get summary statistics from the data."""
-    if df.empty:
+    With project (default PROJECTED_FETCH) batched tabs whose layout is
+    already known are fetched column by column and yielded as
+    ProjectedValues instead of the full grid.
+    """
+    if batch is None:
+        batch = BATCH_FETCH
+    if project is None:
+        project = PROJECTED_FETCH
+    if worksheets is None:
+        worksheets = included_worksheets(spreadsheet)
+
+    if batch:
+        chunks = _chunk_titles([ws.title for ws in worksheets], max_tabs, project, spreadsheet.id)
+        tasks = [
+            (idx, _batch_get_chunk, (spreadsheet, chunk, project))
+            for idx, chunk in enumerate(chunks)
+        ]
+        for _, tabs in run_concurrently(tasks):
+            # Hand tabs over one at a time so each can be freed once parsed
+            tabs.reverse()
+            while tabs:
+                yield tabs.pop()
+    else:
+        tasks = [(ws.title, _fetch_tab, (ws,)) for ws in worksheets]
+        yield from run_concurrently(tasks)
+
+
+def _fetch_tab(worksheet):
+    """get_all_values() for one tab, traced as a 'fetch.tab' span."""
+    with span('fetch.tab', tab=worksheet.title) as attrs:
+        values = worksheet.get_all_values()
+        attrs['rows'] = len(values)
+    return values
+
+
+def fetch_sheet_values(spreadsheet, worksheets=None, batch=None, project=None):
+    """
+    Fetch raw values for worksheets (default: every non-excluded tab).
+    Returns a list of (title, all_values) in worksheet order.
+    """
+    if worksheets is None:
+        worksheets = included_worksheets(spreadsheet)
+    values = dict(iter_sheet_values(spreadsheet, worksheets, batch=batch, project=project))
+    return [(ws.title, values[ws.title]) for ws in worksheets]
+
+
+def _empty_frame():
+    """An empty frame with the read_all_data() columns."""
+    return pd.DataFrame(columns=COLUMNS)
+
+
+def parse_sheet(title, all_values, sheet_id=SHEET_ID):
+    """
+    Parse one tab's raw values (or ProjectedValues) into a DataFrame of
+    COLUMNS. sheet_id is the spreadsheet the tab belongs to, which keys
+    its remembered header layout.
+    """
+    if isinstance(all_values, ProjectedValues):
+        # Already cut down to the mapped columns, keyed by field name
+        if 'video_link' not in all_values.columns or not len(all_values):
+            return _empty_frame()
+        cells = all_values.padded()
+    else:
+        if len(all_values) < 2:
+            return _empty_frame()
+
+        header_row_idx, columns = sheet_layout(title, all_values, sheet_id)
+
+        data_rows = all_values[header_row_idx + 1:]
+        if columns.get('video_link') is None or not data_rows:
+            return _empty_frame()
+
+        # Cells of each mapped column; short rows read as empty
+        cells = {
+            field: [row[idx] if idx < len(row) else '' for row in data_rows]
+            for field, idx in columns.items() if idx is not None
+        }
+
+    # Skip empty rows and non-video URLs
+    links = cells['video_link']
+    keep = [i for i, link in enumerate(links) if 'http' in link.lower() and link.strip()]
+    if not keep:
+        return _empty_frame()
+
+    def column(field):
+        values = cells.get(field)
+        if values is None:
+            return [''] * len(keep)
+        if len(keep) == len(values):
+            return values
+        return [values[i] for i in keep]
+
+    # All four metric columns parsed in one go
+    rows = len(keep)
+    metric_cells = column('reactions') + column('comments') + column('shares') + column('views')
+    if len(metric_cells) < VECTORIZE_MIN_CELLS:
+        metrics = _parse_cells(metric_cells)
+    else:
+        metrics = parse_numbers(pd.Series(metric_cells, dtype=object)).to_numpy()
+    reactions, comments, shares, views = (metrics[i * rows:(i + 1) * rows] for i in range(4))
+    stripped = [link.strip() for link in column('video_link')]
+    platforms = {link: detect_platform(link) for link in set(stripped)}
+
+    return pd.DataFrame({
+        'sheet': title,
+        'content_creator': column('content_creator'),
+        'video_link': stripped,
+        'platform': [platforms[link] for link in stripped],
+        'reactions': reactions,
+        'comments': comments,
+        'shares': shares,
+        'views': views,
+        'engagement': reactions + comments + shares,
+    })
+
+
+def iter_tab_frames(spreadsheet, worksheets=None, batch=None, max_tabs=None):
+    """
+    Yield (title, frame) for every non-excluded tab as it is fetched and
+    parsed. Frames already have the compact schema dtypes and each tab's
+    raw values are dropped before its frame is handed over, so only the
+    tabs in flight are ever held as raw cell strings.
+    """
+    for title, all_values in iter_sheet_values(spreadsheet, worksheets, batch, max_tabs):
+        frame = parse_tab(title, all_values, spreadsheet.id)
+        del all_values
+        yield title, frame
+
+
+def parse_tab(title, all_values, sheet_id=SHEET_ID):
+    """
+    parse_sheet() plus each row's canonical video key (see video_urls)
+    and apply_schema(), traced as a 'parse' span. Keys are worked out
+    here, one tab at a time, so deduplication never has to look at every
+    link of the workbook at once.
+    """
+    with span('parse', tab=title) as attrs:
+        frame = parse_sheet(title, all_values, sheet_id)
+        frame['video_key'] = video_keys(frame['video_link'])
+        frame = apply_schema(frame)
+        attrs['rows'] = len(frame)
+    return frame
+
+
+def assemble_frames(tab_frames, titles=None, with_duplicates=False):
+    """
+    Build the dashboard DataFrame from (title, frame) pairs such as
+    iter_tab_frames() yields, in the order of titles when given.
+    With DEDUPE_VIDEOS, a video linked more than once keeps only its
+    first row. With with_duplicates, returns (df, duplicates) instead,
+    duplicates being the dropped rows (None when nothing was dropped).
+    """
+    frames = dict(tab_frames)
+    if titles is not None:
+        frames = {title: frames[title] for title in titles if title in frames}
+    duplicates = None
+    with span('assemble', tabs=len(frames)) as attrs:
+        df = concat_typed(frames.values())
+        if df is None:
+            df = apply_schema(pd.DataFrame(columns=FRAME_COLUMNS))
+        elif DEDUPE_VIDEOS:
+            duplicated = duplicate_videos(df)
+            if duplicated is not None:
+                duplicates = df[duplicated]
+                df = df[~duplicated].reset_index(drop=True)
+        attrs['rows'] = len(df)
+    return (df, duplicates) if with_duplicates else df
+
+
+def spreadsheet_sources(spreadsheets=None):
+    """
+    The spreadsheets to load (default SPREADSHEETS), each as a dict with
+    'id', 'name' and 'excluded_sheets'. Entries may be plain IDs.
+    """
+    sources = []
+    for entry in SPREADSHEETS if spreadsheets is None else spreadsheets:
+        if isinstance(entry, str):
+            entry = {'id': entry}
+        sources.append({
+            'id': entry['id'],
+            'name': entry.get('name') or entry['id'],
+            'excluded_sheets': entry.get('excluded_sheets', EXCLUDED_SHEETS),
+        })
+
+    names = [source['name'] for source in sources]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Spreadsheet names must be unique: {names}")
+    return sources
+
+
+def tag_source(frame, name):
+    """frame with a leading categorical 'source' column holding name."""
+    source = pd.Categorical.from_codes(np.zeros(len(frame), dtype=np.int8), categories=[name])
+    return pd.concat([pd.DataFrame({'source': source}, index=frame.index), frame], axis=1)
+
+
+def assemble_sources(source_caches, with_duplicates=False):
+    """
+    The dashboard DataFrame: every source's tab frames, in source then
+    worksheet order, tagged with their source name and deduplicated
+    across spreadsheets by assemble_frames() (which also explains
+    with_duplicates).
+    """
+    df, duplicates = assemble_frames(
+        (
+            ((cache.source['name'], title), tag_source(frame, cache.source['name']))
+            for cache in source_caches
+            for title, frame in cache.tab_frames.items()
+        ),
+        with_duplicates=True,
+    )
+    if 'source' not in df.columns:
+        df.insert(0, 'source', pd.Categorical([]))
+    return (df, duplicates) if with_duplicates else df
+
+
+def read_all_data(client=None, sources=None):
+    """
+    Read all engagement data from all sheets of every spreadsheet in
+    sources (default SPREADSHEETS), loaded concurrently.
+    Returns a pandas DataFrame with all data and a 'source' column.
+
+    Pass a client (e.g. fake_sheets.FakeClient) to read from something
+    other than the live Google Sheets API.
+    """
+    cache = DataCache()
+    refresh_data(cache, client, sources=sources)
+    for source_cache in cache.sources.values():
+        if source_cache.last_error is not None:
+            raise source_cache.last_error
+    return cache.df
+
+
+def hash_values(all_values):
+    """Content hash of JSON-able values such as a tab's rows."""
+    payload = json.dumps(all_values, separators=(',', ':')).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def tab_digest(title, all_values, sheet_id=SHEET_ID):
+    """
+    Content hash of a tab, used to spot changed tabs: its header rows and
+    the mapped columns below the header, with trailing empty cells
+    trimmed. A full grid and ProjectedValues of the same content hash the
+    same, so a tab fetched whole (on the first load of a process) and
+    later projected is only re-parsed when it really changed.
+    """
+    if isinstance(all_values, ProjectedValues):
+        header_rows = all_values.header_rows
+        columns = all_values.columns
+    elif len(all_values) < 2:
+        return hash_values(all_values)
+    else:
+        header_row_idx, layout = sheet_layout(title, all_values, sheet_id)
+        # Projected fetches only check the header rows of detected layouts
+        header_rows = [] if configured_layout(title) is not None else all_values[:header_row_idx + 1]
+        rows = all_values[header_row_idx + 1:]
+        columns = {
+            field: [row[idx] if idx < len(row) else '' for row in rows]
+            for field, idx in layout.items() if idx is not None
+        }
+    return hash_values([
+        [_trim(row) for row in header_rows],
+        {field: _trim(values) for field, values in columns.items()},
+    ])
+
+
+def open_spreadsheet(client, sheet_id=SHEET_ID):
+    """client.open_by_key(sheet_id), traced as a 'sheets.open' span."""
+    with span('sheets.open'):
+        return client.open_by_key(sheet_id)
+
+
+def get_modified_time(client, sheet_id=SHEET_ID):
+    """Spreadsheet modifiedTime from the Drive API (a single metadata call)."""
+    with span('sheets.modified_time'):
+        return client.get_file_drive_metadata(sheet_id)['modifiedTime']
+
+
+class SourceCache:
+    """
+    What is needed to refresh one spreadsheet incrementally: its
+    modifiedTime and a content hash and parsed frame per tab, plus when
+    it was last checked and loaded and why its last refresh failed.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.modified_time = None
+        self.tab_hashes = {}
+        self.tab_frames = {}
+        self.tab_summaries = {}
+        self.checked_at = None
+        self.loaded_at = None
+        self.last_error = None
+
+    def age(self):
+        """Seconds since the last change check (None if never checked)."""
+        if self.checked_at is None:
+            return None
+        return time.time() - self.checked_at
+
+    def summary(self):
+        """
+        Summary of every tab's rows, before deduplication. Each tab is
+        summarized once per parsed frame, so after an incremental
+        refresh only the re-parsed tabs are summed again.
+        """
+        tab_summaries = {}
+        for title, frame in self.tab_frames.items():
+            entry = self.tab_summaries.get(title)
+            if entry is None or entry[0] is not frame:
+                entry = (frame, summarize(frame))
+            tab_summaries[title] = entry
+        self.tab_summaries = tab_summaries
+        return sum((entry[1] for entry in tab_summaries.values()), Summary())
+
+    def status(self):
+        """Name, row count, data and check age and last error, for the sidebar."""
         return {
-            'total_posts': 0,
-            'total_reactions': 0,
-            'total_comments': 0,
-            'total_shares': 0,
-            'total_views': 0,
-            'total_engagement': 0,
-            'platforms': {},
-            'creators': [],
+            'name': self.source['name'],
+            'rows': sum(len(frame) for frame in self.tab_frames.values()),
+            'data_age': None if self.loaded_at is None else time.time() - self.loaded_at,
+            'check_age': self.age(),
+            'last_error': self.last_error,
         }
 
-    return {
-        'total_posts': len(df),
-        'total_reactions': df['reactions'].sum(),
-        'total_comments': df['comments'].sum(),
-        'total_shares': df['shares'].sum(),
-        'total_views': df['views'].sum() if 'views' in df.columns else 0,
-        'total_engagement': df['engagement'].sum(),
-        'platforms': df['platform'].value_counts().to_dict(),
-        'creators': df['content_creator'].unique().tolist(),
+
+class DataCache:
+    """
+    Last loaded dashboard data: the merged DataFrame of every source
+    spreadsheet plus a SourceCache per spreadsheet, keyed by source name,
+    for refreshing each one incrementally. duplicates holds the rows
+    deduplication dropped from df (None when there were none).
+    """
+
+    def __init__(self):
+        self.df = assemble_sources([])
+        self.duplicates = None
+        self.sources = {}
+        self.checked_at = None
+        self.loaded_at = None
+        self.lock = threading.Lock()
+        self._derived = {}
+
+    @property
+    def modified_time(self):
+        """modifiedTime per source name."""
+        return {name: source.modified_time for name, source in self.sources.items()}
+
+    def age(self):
+        """Seconds since the last change check (None if never checked)."""
+        if self.checked_at is None:
+            return None
+        return time.time() - self.checked_at
+
+    def source_status(self):
+        """SourceCache.status() of every source."""
+        return [source.status() for source in list(self.sources.values())]
+
+    def derived(self, name, build, df=None):
+        """
+        Return build(df), computing it only once per loaded DataFrame.
+        Used for structures derived from the data (rollups, indexes)
+        that should be rebuilt when a refresh swaps in new data.
+        df defaults to the current cache.df.
+        """
+        if df is None:
+            df = self.df
+        entry = self._derived.get(name)
+        if entry is None or entry[0] is not df:
+            entry = (df, build(df))
+            self._derived[name] = entry
+        return entry[1]
+
+    def summary(self, df=None):
+        """
+        Summary of df (default cache.df). For data loaded by a refresh it
+        is already there, put together by assemble() from the per-tab
+        summaries.
+        """
+        return self.derived('summary', summarize, df)
+
+    def assemble(self, source_caches):
+        """
+        Swap in the merged DataFrame of source_caches along with its
+        summary: the sum of their tab summaries (see SourceCache.summary())
+        less the rows deduplication dropped.
+        """
+        df, duplicates = assemble_sources(source_caches, with_duplicates=True)
+        with span('summary'):
+            summary = sum((source_cache.summary() for source_cache in source_caches), Summary())
+            if duplicates is not None:
+                summary -= summarize(duplicates)
+        self._derived['summary'] = (df, summary)
+        self.duplicates = duplicates
+        self.df = df
+
+
+def refresh_source(cache, client, force=False):
+    """
+    Bring one SourceCache up to date.
+
+    Checks the spreadsheet modifiedTime first and returns straight away
+    if it has not moved. Otherwise fetches the tab values and re-parses
+    only the tabs whose content hash changed. Returns the list of
+    re-parsed tab titles.
+    """
+    sheet_id = cache.source['id']
+    modified_time = get_modified_time(client, sheet_id)
+    cache.checked_at = time.time()
+
+    if not force and cache.loaded_at is not None and modified_time == cache.modified_time:
+        return []
+
+    spreadsheet = open_spreadsheet(client, sheet_id)
+    worksheets = included_worksheets(spreadsheet, excluded=cache.source['excluded_sheets'])
+
+    tab_hashes = {}
+    parsed = {}
+
+    # Hash and parse each tab as it arrives, while the rest download
+    for title, all_values in iter_sheet_values(spreadsheet, worksheets):
+        with span('hash', tab=title):
+            digest = tab_digest(title, all_values, sheet_id)
+        tab_hashes[title] = digest
+        if force or cache.tab_hashes.get(title) != digest:
+            parsed[title] = parse_tab(title, all_values, sheet_id)
+        del all_values
+
+    # Keep worksheet order, so row order does not depend on arrival order
+    titles = [ws.title for ws in worksheets]
+    changed = [title for title in titles if title in parsed]
+
+    # Only record the new revision once the data behind it is in place
+    cache.tab_frames = {
+        title: parsed[title] if title in parsed else cache.tab_frames[title]
+        for title in titles
     }
+    cache.modified_time = modified_time
+    cache.tab_hashes = tab_hashes
+    cache.loaded_at = time.time()
+    return changed
+
+
+def refresh_data(cache, client=None, force=False, sources=None):
+    """
+    Bring a DataCache up to date.
+
+    Every spreadsheet in sources (default SPREADSHEETS) is refreshed with
+    refresh_source() at the same time, and cache.df is rebuilt as soon as
+    each changed one is done, so a slow workbook doesn't hold back the
+    others. A workbook that fails keeps serving the tabs it last loaded
+    and its error is kept in its SourceCache.last_error; only when every
+    source fails is the error raised. Returns the re-parsed tabs as
+    (source name, title) pairs.
+    """
+    sources = spreadsheet_sources(sources)
+    with cache.lock:
+        if client is None:
+            client = get_client()
+
+        source_caches = []
+        for source in sources:
+            source_cache = cache.sources.get(source['name']) or SourceCache(source)
+            source_cache.source = source  # Pick up edited IDs or excluded sheets
+            source_caches.append(source_cache)
+        removed = set(cache.sources) - {source['name'] for source in sources}
+        cache.sources = {source_cache.source['name']: source_cache for source_cache in source_caches}
+
+        changed = []
+        errors = []
+        rebuild = bool(removed) or cache.loaded_at is None
+        previous_titles = {id(source_cache): list(source_cache.tab_frames) for source_cache in source_caches}
+        with ThreadPoolExecutor(max_workers=max(1, len(source_caches)), thread_name_prefix='sheets-source') as pool:
+            futures = {
+                pool.submit(refresh_source, source_cache, client, force): source_cache
+                for source_cache in source_caches
+            }
+            for future in as_completed(futures):
+                source_cache = futures[future]
+                try:
+                    titles = future.result()
+                except Exception as e:
+                    source_cache.last_error = e  # Keep serving what it loaded before
+                    errors.append(e)
+                    continue
+                source_cache.last_error = None
+
+                name = source_cache.source['name']
+                changed.extend((name, title) for title in titles)
+                if titles or list(source_cache.tab_frames) != previous_titles[id(source_cache)]:
+                    # Swap in this source's data without waiting for the others
+                    cache.assemble(source_caches)
+                    rebuild = False
+
+        cache.checked_at = time.time()
+        if errors and len(errors) == len(source_caches):
+            raise errors[0]
+        if rebuild:
+            cache.assemble(source_caches)
+        loaded = [source_cache.loaded_at for source_cache in source_caches if source_cache.loaded_at is not None]
+        if loaded:
+            cache.loaded_at = max(loaded)
+        return changed
+
+
+def save_snapshot(cache, path=SNAPSHOT_FILE):
+    """
+    Write cache.df to a local Arrow IPC file so a fresh process can serve
+    data before it has talked to Google. The rows deduplication dropped
+    follow the others, so load_snapshot() can rebuild every tab whole.
+    The file is written next to the target and renamed into place, so
+    readers never see a partial file.
+    """
+    import pyarrow as pa
+
+    duplicates = cache.duplicates
+    metadata = {
+        'fetched_at': str(cache.loaded_at or time.time()),
+        'sources': json.dumps({
+            name: {
+                'id': source.source['id'],
+                'modified_time': source.modified_time,
+                'tab_hashes': source.tab_hashes,
+                'loaded_at': source.loaded_at,
+            }
+            for name, source in cache.sources.items()
+        }),
+        # Positions of the dropped rows among all rows, in load order
+        'duplicates': json.dumps([] if duplicates is None else duplicates.index.tolist()),
+    }
+    table = pa.Table.from_pandas(cache.df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+            if duplicates is not None:
+                writer.write_table(pa.Table.from_pandas(duplicates, schema=table.schema, preserve_index=False))
+    os.replace(tmp_path, path)
+
+
+def _restored_tab_frame(frame):
+    """
+    One tab's rows of a snapshot as a parsed tab frame: without the source
+    column and with only the categories the tab itself uses, as if parsed.
+    """
+    frame = frame.drop(columns='source').reset_index(drop=True)
+    return frame.assign(**{
+        col: frame[col].cat.remove_unused_categories()
+        for col in CATEGORY_COLUMNS if col in frame.columns
+    })
+
+
+def load_snapshot(path=SNAPSHOT_FILE, sources=None):
+    """
+    Restore a DataCache from a snapshot written by save_snapshot().
+    Returns None when there is no usable snapshot (including one from
+    before the dashboard merged several spreadsheets or kept the rows
+    deduplication dropped).
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        import pyarrow as pa
+
+        # Read into memory rather than mapping the file: string columns
+        # would keep pointing into the map, and a mapped file can't be
+        # replaced by the next save_snapshot() on Windows
+        with pa.OSFile(path, 'rb') as source:
+            table = pa.ipc.open_file(source).read_all()
+        metadata = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+        saved_sources = json.loads(metadata['sources'])
+        positions = json.loads(metadata['duplicates'])
+        rows = table.to_pandas()
+    except Exception:
+        return None  # Corrupt, unreadable or old-format snapshot, load from Sheets instead
+
+    cache = DataCache()
+    kept = len(rows) - len(positions)
+    cache.df = rows.iloc[:kept].reset_index(drop=True)
+    cache.loaded_at = float(metadata.get('fetched_at', 0)) or None
+    if positions:
+        # Put the dropped rows back where they were, so each tab is whole
+        cache.duplicates = rows.iloc[kept:].set_axis(positions)
+        dropped = np.zeros(len(rows), dtype=bool)
+        dropped[positions] = True
+        order = np.empty(len(rows), dtype=np.intp)
+        order[~dropped] = np.arange(kept)
+        order[dropped] = np.arange(kept, len(rows))
+        rows = rows.take(order)
+
+    # Rebuild per-tab frames so the next refresh can stay incremental.
+    # They include the rows deduplication dropped: once the first copy of
+    # a video goes away, a later tab's copy has to show up again.
+    by_tab = {
+        key: _restored_tab_frame(frame)
+        for key, frame in rows.groupby(['source', 'sheet'], sort=False, observed=True)
+    }
+    configured = {source['name']: source for source in spreadsheet_sources(sources)}
+    for name, saved in saved_sources.items():
+        if name not in configured or configured[name]['id'] != saved['id']:
+            continue  # No longer configured: the next refresh drops its rows
+        source_cache = SourceCache(configured[name])
+        source_cache.modified_time = saved['modified_time']
+        source_cache.tab_hashes = saved['tab_hashes']
+        source_cache.loaded_at = saved['loaded_at']
+        source_cache.tab_frames = {
+            title: by_tab.get((name, title), _empty_frame())
+            for title in saved['tab_hashes']
+        }
+        cache.sources[name] = source_cache
+    return cache
+
+
+def refresh_and_save(cache, client=None, snapshot_path=SNAPSHOT_FILE, force=False, history_path=HISTORY_DB):
+    """
+    refresh_data(), then rewrite the snapshot if the sheet had moved on
+    and append the changed metrics to the engagement history.
+    """
+    with span('refresh') as attrs:
+        previous = cache.modified_time
+        changed = refresh_data(cache, client, force=force)
+        # A hit means the cached data was still current
+        attrs['cache'] = 'miss' if changed else 'hit'
+        attrs['changed_tabs'] = len(changed)
+        try:
+            if snapshot_path and (changed or cache.modified_time != previous):
+                with span('snapshot.save'):
+                    save_snapshot(cache, snapshot_path)
+        finally:
+            # The history still gets the new metrics if the snapshot failed
+            if history_path and changed:
+                with span('history.record') as history_attrs:
+                    history_attrs['rows'] = record_snapshot(cache.df, cache.loaded_at, history_path)
+    return changed
+
+
+class BackgroundRefresher:
+    """
+    Keeps a DataCache fresh from a daemon thread, so no request waits on
+    Google Sheets. Every `interval` seconds (or when triggered) it runs
+    refresh_and_save(); readers keep getting the previous cache.df until
+    the refresh swaps in the new one.
+    """
+
+    def __init__(self, cache, interval=REFRESH_INTERVAL, client=None, snapshot_path=SNAPSHOT_FILE):
+        self.cache = cache
+        self.interval = interval
+        self.client = client
+        self.snapshot_path = snapshot_path
+        self.refreshing = False
+        self.last_error = None
+        self.thread = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self, immediate=True):
+        """Start the worker thread; with immediate, refresh right away."""
+        if self.thread is not None and self.thread.is_alive():
+            return self
+        if immediate:
+            self._wake.set()
+        self.thread = threading.Thread(target=self._run, name='sheets-refresh', daemon=True)
+        self.thread.start()
+        return self
+
+    def trigger(self):
+        """Ask for a refresh now instead of at the next interval."""
+        self.refreshing = True  # Reported as running until the worker is done
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self.refresh()
+
+    def refresh(self, force=False):
+        """Run one refresh on the calling thread, recording any error."""
+        self.refreshing = True
+        try:
+            changed = refresh_and_save(self.cache, self.client, self.snapshot_path, force=force)
+        except Exception as e:
+            self.last_error = e  # Keep serving the data we already have
+            return None
+        else:
+            self.last_error = None
+            return changed
+        finally:
+            self.refreshing = False
+
+    def status(self):
+        """
+        Data age, check age, whether a refresh is running, the last error
+        and SourceCache.status() per source spreadsheet.
+        """
+        now = time.time()
+        loaded_at = self.cache.loaded_at
+        return {
+            'data_age': None if loaded_at is None else now - loaded_at,
+            'check_age': self.cache.age(),
+            'refreshing': self.refreshing,
+            'last_error': self.last_error,
+            'sources': self.cache.source_status(),
+        }
+
+
+def get_summary_stats(df):
+    """Get summary statistics from the data (a summary.Summary, read like a dict)."""
+    return summarize(df)
 
 
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Test the Google Sheets connection.")
+    parser.add_argument('--profile', action='store_true',
+                        help="print a timing breakdown of the load path")
+    parser.add_argument('--trace-file', help="also write the timing spans to this JSON lines file")
+    args = parser.parse_args()
+
     print("Testing Google Sheets connection...")
     print()
 
     try:
-        df = read_all_data()
+        with span('load'):
+            df = read_all_data()
         print(f"Loaded {len(df)} rows")
         print()
         print("Summary:")
@@ -254,5 +1221,16 @@ if __name__ == '__main__':
         print()
         print("Sample data:")
         print(df.head())
+        print()
+        print("Memory usage:")
+        print(format_memory_report(memory_usage(df)))
     except Exception as e:
         print(f"Error: {e}")
+
+    if args.profile:
+        print()
+        print("Timing breakdown:")
+        print(format_summary(default_tracer().summary()))
+    if args.trace_file:
+        count = default_tracer().export_jsonl(args.trace_file)
+        print(f"Wrote {count} spans to {args.trace_file}")
@@ -3,12 +3,22 @@ Video Engagement Dashboard
 Displays engagement data from Google Sheets (FB, IG, TikTok)
 """
 
+import time
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from sheets_reader import read_all_data, get_summary_stats
-from config import DASHBOARD_TITLE
+from sheets_reader import (
+    BackgroundRefresher, DataCache, FilterIndex, load_snapshot, refresh_and_save,
+)
+from filter_index import combine
+from rollup import RollupCube
+from ranking import Ranking
+from figure_cache import FigureCache
+from html_tables import format_thousands, render_table
+from history import growth
+from tracing import default_tracer
+from config import DASHBOARD_TITLE, REFRESH_INTERVAL, HISTORY_DB, ADMIN_PANEL
 
 # Page config
 st.set_page_config(
@@ -26,14 +36,297 @@ def format_number(num):
     return str(int(num))
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@st.cache_resource
+def get_refresher():
+    """
+    Process-wide data cache and background refresher shared by every session.
+    Starts from the on-disk snapshot when there is one; the refresher
+    revalidates it straight away and then every REFRESH_INTERVAL seconds,
+    so no request waits on Google Sheets.
+    """
+    cache = load_snapshot() or DataCache()
+    refresher = BackgroundRefresher(cache, interval=REFRESH_INTERVAL)
+    refresher.start(immediate=cache.loaded_at is not None)
+    return refresher
+
+
+def get_data_cache():
+    """The DataCache kept fresh by get_refresher()."""
+    return get_refresher().cache
+
+
 def load_data():
-    """Load data from Google Sheets with caching."""
-    return read_all_data()
+    """
+    Return the current dashboard data.
+    Only the very first load (no snapshot yet) fetches on the request
+    path; afterwards the background refresher keeps the data current.
+    """
+    cache = get_data_cache()
+    if cache.loaded_at is None:
+        refresh_and_save(cache)
+    return cache.df
+
+
+def format_age(seconds):
+    """Rough human-readable age, e.g. '42s', '5 min', '2 h'."""
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def lazy_section(label, key):
+    """
+    A collapsed expander whose open state triggers a rerun, so a section's
+    contents are only computed (under `if section.open:`) while it is open.
+    """
+    return st.expander(label, key=key, on_change='rerun')
+
+
+# All Posts table: sort choices (label -> column) and page sizes
+POSTS_SORT_OPTIONS = {
+    "Total Engagement": 'engagement',
+    "Views": 'views',
+    "Reactions": 'reactions',
+    "Comments": 'comments',
+    "Shares": 'shares',
+}
+POSTS_PAGE_SIZES = [25, 50, 100, 250]
+POSTS_DISPLAY_COLS = ['content_creator', 'platform', 'sheet', 'reactions', 'comments', 'shares', 'views', 'engagement', 'video_link']
+
+
+@st.fragment
+def render_posts_page(df, ranking, positions, filters, total):
+    """
+    Render one page of the All Posts table.
+    Sort key, direction, page size and current page live in session state.
+    Runs as a fragment, so paging and sorting rerun only the table.
+    """
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort_label = st.selectbox("Sort by", list(POSTS_SORT_OPTIONS), key='posts_sort')
+    with col2:
+        ascending = st.toggle("Ascending", key='posts_ascending')
+    with col3:
+        page_size = st.selectbox("Rows per page", POSTS_PAGE_SIZES, index=1, key='posts_page_size')
+
+    # Go back to the first page whenever the filters or sorting change
+    view_key = (tuple(filters.items()), sort_label, ascending, page_size)
+    if st.session_state.get('posts_view') != view_key:
+        st.session_state['posts_view'] = view_key
+        st.session_state['posts_page'] = 1
+
+    page_count = max(1, -(-total // page_size))
+    st.session_state['posts_page'] = min(st.session_state.get('posts_page', 1), page_count)
+
+    page_positions, _ = ranking.page(
+        POSTS_SORT_OPTIONS[sort_label], positions,
+        page=st.session_state['posts_page'] - 1, page_size=page_size, ascending=ascending,
+    )
+    page_df = df.take(page_positions)[POSTS_DISPLAY_COLS]
+
+    # Posts without views show as blank instead of 0
+    page_df = page_df.assign(views=page_df['views'].astype('Int64').mask(page_df['views'] <= 0))
+
+    st.dataframe(
+        page_df,
+        column_config={
+            "content_creator": "Creator",
+            "platform": "Platform",
+            "sheet": "Sheet",
+            "reactions": st.column_config.NumberColumn("Reactions", format="%d"),
+            "comments": st.column_config.NumberColumn("Comments", format="%d"),
+            "shares": st.column_config.NumberColumn("Shares", format="%d"),
+            "views": st.column_config.NumberColumn("Views", format="%d"),
+            "engagement": st.column_config.NumberColumn("Total", format="%d"),
+            "video_link": st.column_config.LinkColumn("Video Link", display_text="Open")
+        },
+        height=min(600, 38 + 35 * len(page_df)),
+        width='stretch',
+        hide_index=True
+    )
+
+    first = (st.session_state['posts_page'] - 1) * page_size + 1
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.caption(f"Showing {first:,}–{first + len(page_df) - 1:,} of {total:,} posts")
+    with col2:
+        st.number_input("Page", min_value=1, max_value=page_count, step=1, key='posts_page')
+
+
+def platform_distribution_figure(cube, rows):
+    """Pie of post counts per platform."""
+    platform_counts = cube.group('platform', rows)['posts'].sort_values(ascending=False)
+    platform_counts = platform_counts[platform_counts > 0]
+    fig = px.pie(
+        values=platform_counts.values,
+        names=platform_counts.index,
+        color_discrete_sequence=px.colors.qualitative.Set2
+    )
+    fig.update_layout(margin=dict(t=20, b=20, l=20, r=20))
+    return fig
+
+
+def platform_engagement_figure(cube, rows):
+    """Grouped bars of reactions, comments and shares per platform."""
+    platform_engagement = cube.group('platform', rows)[['reactions', 'comments', 'shares']].reset_index()
+
+    fig = px.bar(
+        platform_engagement,
+        x='platform',
+        y=['reactions', 'comments', 'shares'],
+        barmode='group',
+        color_discrete_sequence=['#FF6B6B', '#4ECDC4', '#45B7D1']
+    )
+    fig.update_layout(
+        margin=dict(t=20, b=20, l=20, r=20),
+        xaxis_title="",
+        yaxis_title="Count",
+        legend_title=""
+    )
+    return fig
+
+
+def top_creators_figure(cube, rows):
+    """Top 10 creators by engagement, or None when there are none."""
+    creator_engagement = cube.top('content_creator', 'engagement', 10, rows)[['engagement', 'posts']]
+    if creator_engagement.empty:
+        return None
+
+    fig = px.bar(
+        creator_engagement.reset_index(),
+        x='engagement',
+        y='content_creator',
+        orientation='h',
+        color='engagement',
+        color_continuous_scale='Viridis'
+    )
+    fig.update_layout(
+        margin=dict(t=20, b=20, l=20, r=20),
+        xaxis_title="Total Engagement",
+        yaxis_title="",
+        showlegend=False,
+        yaxis={'categoryorder': 'total ascending'}
+    )
+    return fig
+
+
+def creator_views_figure(cube, rows, platform, color_scale):
+    """Top 10 creators by views on one platform."""
+    creator_views = cube.top('content_creator', 'viewed_views', 10, cube.viewed(rows, platform=platform), skip_blank=False)
+    creator_views = creator_views[['viewed_views', 'viewed_posts']].rename(
+        columns={'viewed_views': 'views', 'viewed_posts': 'videos'}
+    )
+
+    fig = px.bar(
+        creator_views.reset_index(),
+        x='views',
+        y='content_creator',
+        orientation='h',
+        color='views',
+        color_continuous_scale=color_scale
+    )
+    fig.update_layout(
+        margin=dict(t=20, b=20, l=20, r=20),
+        xaxis_title="Total Views",
+        yaxis_title="",
+        showlegend=False,
+        yaxis={'categoryorder': 'total ascending'}
+    )
+    return fig
+
+
+def views_distribution_figure(cube, rows):
+    """Pie of views per platform, or None when nothing has views."""
+    views_by_platform = cube.group('platform', cube.viewed(rows))[['viewed_views', 'viewed_posts']].rename(
+        columns={'viewed_views': 'views', 'viewed_posts': 'videos'}
+    ).reset_index()
+    if views_by_platform.empty:
+        return None
+
+    fig = px.pie(
+        views_by_platform,
+        values='views',
+        names='platform',
+        title='Total Views Distribution',
+        color_discrete_sequence=['#4267B2', '#000000', '#E1306C']  # FB blue, TikTok black, IG pink
+    )
+    fig.update_layout(margin=dict(t=40, b=20, l=20, r=20))
+    return fig
+
+
+# Growth windows offered by the Growth section, in hours
+GROWTH_WINDOWS = {'Last 6 hours': 6, 'Last 24 hours': 24, 'Last 3 days': 72, 'Last 7 days': 168}
+
+# The growth chart's window ends at the time it is built; a cached chart
+# is rebuilt once it is this many seconds behind
+GROWTH_FIGURE_SECONDS = 600
+
+
+def growth_figure(hours, filters):
+    """Bar chart of the 10 videos that gained the most views, or None."""
+    gains = growth(hours)
+    for column, value in (('platform', filters['platform']), ('content_creator', filters['creator']),
+                          ('sheet', filters['sheet']), ('source', filters['source'])):
+        if value is not None:
+            gains = gains[gains[column] == value]
+    gains = gains[gains['views_growth'] > 0].head(10)
+    if gains.empty:
+        return None
+
+    gains = gains.assign(label=gains['content_creator'].fillna('') + ' · ' + gains['video_key'])
+    fig = px.bar(
+        gains,
+        x='views_growth',
+        y='label',
+        orientation='h',
+        title='Top 10 by Views Gained',
+        color='platform',
+        hover_data={'views_per_hour': ':,.0f', 'views': ':,', 'label': False},
+        labels={'views_growth': 'Views gained', 'label': '', 'views_per_hour': 'Views/hour'},
+    )
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, margin=dict(t=40, b=20, l=20, r=20))
+    return fig
+
+
+def top_posts_table(ranking, positions):
+    """HTML table of the top 10 posts by engagement."""
+    top_posts = ranking.top_rows('engagement', positions, 10)[['content_creator', 'platform', 'reactions', 'comments', 'shares', 'views', 'engagement', 'video_link']]
+    # Views only show for platforms that have them
+    return render_table(top_posts, link_width=40, comma_columns=['views'], blank_zero_columns=['views'])
+
+
+def top_views_table(ranking, positions):
+    """HTML table of the top 10 videos by views."""
+    top_views = ranking.top_rows('views', positions, 10, positive=True)[['content_creator', 'views', 'reactions', 'comments', 'shares', 'video_link']]
+    return render_table(top_views, link_width=35, comma_columns=['views'])
+
+
+def admin_panel(tracer, figures):
+    """Sidebar breakdown of where load and render time went, with a JSON lines export."""
+    with st.sidebar.expander("⏱ Load timings"):
+        summary = tracer.summary()
+        if not summary:
+            st.caption("No timings recorded yet.")
+            return
+        st.dataframe(
+            pd.DataFrame(summary).reindex(columns=['name', 'count', 'total', 'mean', 'max', 'rows', 'bytes', 'errors']),
+            hide_index=True,
+            width='stretch',
+        )
+        st.caption(f"Figure cache: {figures.hits} hits, {figures.misses} misses")
+        st.download_button("Download spans (JSON lines)", tracer.to_jsonl(),
+                           file_name='dashboard_spans.jsonl', mime='application/x-ndjson')
+        if st.button("Clear timings"):
+            tracer.clear()
 
 
 def main():
     st.title(f"📊 {DASHBOARD_TITLE}")
+    # Each laps.lap(name) records the time since the previous one as 'render.<name>'
+    tracer = default_tracer()
+    laps = tracer.laps('render')
 
     # Load data
     try:
@@ -47,9 +340,17 @@ def main():
         st.warning("No data found in the Google Sheet.")
         return
 
+    laps.lap('load', rows=len(df))
+
     # Sidebar filters
     st.sidebar.header("Filters")
 
+    # Source filter, only when several spreadsheets are merged
+    sources = df['source'].unique().tolist()
+    selected_source = 'All'
+    if len(sources) > 1:
+        selected_source = st.sidebar.selectbox("Source", ['All'] + sources)
+
     # Platform filter
     platforms = ['All'] + sorted(df['platform'].unique().tolist())
     selected_platform = st.sidebar.selectbox("Platform", platforms)
@@ -62,22 +363,57 @@ def main():
     sheets = ['All'] + sorted(df['sheet'].unique().tolist())
     selected_sheet = st.sidebar.selectbox("Sheet", sheets)
 
-    # Apply filters
-    filtered_df = df.copy()
-    if selected_platform != 'All':
-        filtered_df = filtered_df[filtered_df['platform'] == selected_platform]
-    if selected_creator != 'All':
-        filtered_df = filtered_df[filtered_df['content_creator'] == selected_creator]
-    if selected_sheet != 'All':
-        filtered_df = filtered_df[filtered_df['sheet'] == selected_sheet]
-
-    # Refresh button
+    # Resolve filters to row positions through the per-load filter index
+    filters = {
+        'platform': None if selected_platform == 'All' else selected_platform,
+        'creator': None if selected_creator == 'All' else selected_creator,
+        'sheet': None if selected_sheet == 'All' else selected_sheet,
+        'source': None if selected_source == 'All' else selected_source,
+    }
+    cache = get_data_cache()
+    index = cache.derived('filter_index', FilterIndex, df)
+    positions = index.positions(**filters)
+
+    # Refresh button: runs on the background worker, the page keeps
+    # showing the current data until the new data is swapped in
+    refresher = get_refresher()
     if st.sidebar.button("🔄 Refresh Data"):
-        st.cache_data.clear()
-        st.rerun()
-
-    # Summary metrics
-    stats = get_summary_stats(filtered_df)
+        refresher.trigger()
+
+    status = refresher.status()
+    if status['data_age'] is not None:
+        st.sidebar.caption(f"Data updated {format_age(status['data_age'])} ago")
+    if status['refreshing']:
+        st.sidebar.caption("🔄 Refreshing in the background…")
+    if status['last_error'] is not None:
+        st.sidebar.error(f"Refresh failed: {status['last_error']}")
+    for source in status['sources']:
+        # One failing spreadsheet keeps showing its last loaded data
+        if source['last_error'] is not None:
+            age = 'never loaded' if source['data_age'] is None else f"data from {format_age(source['data_age'])} ago"
+            st.sidebar.warning(f"{source['name']}: refresh failed ({age}): {source['last_error']}")
+
+    # Aggregates come from the rollup cube, built once per data load
+    cube = cache.derived('rollup', RollupCube, df)
+    rows = cube.select(**filters)
+    ranking = cache.derived('ranking', Ranking, df)
+
+    # Figures and HTML tables are cached per data load and filter selection
+    figures = cache.derived('figures', lambda df: FigureCache(), df)
+
+    def cached(key, build):
+        return figures.get(key + tuple(filters.values()), build)
+
+    def figure(build, *args):
+        return cached((build.__name__,) + args, lambda: build(cube, rows, *args))
+
+    laps.lap('sidebar')
+
+    # Summary metrics; unfiltered, the load's summary is already there
+    if any(value is not None for value in filters.values()):
+        stats = cube.totals(rows)
+    else:
+        stats = cache.summary(df)
 
     col1, col2, col3, col4, col5, col6 = st.columns(6)
     with col1:
@@ -93,6 +429,7 @@ def main():
     with col6:
         st.metric("Total Engagement", format_number(stats['total_engagement']))
 
+    laps.lap('metrics')
     st.divider()
 
     # Charts row
@@ -100,39 +437,15 @@ def main():
 
     with col1:
         st.subheader("📈 Platform Distribution")
-        if not filtered_df.empty:
-            platform_counts = filtered_df['platform'].value_counts()
-            fig = px.pie(
-                values=platform_counts.values,
-                names=platform_counts.index,
-                color_discrete_sequence=px.colors.qualitative.Set2
-            )
-            fig.update_layout(margin=dict(t=20, b=20, l=20, r=20))
-            st.plotly_chart(fig, use_container_width=True)
+        if stats['total_posts']:
+            st.plotly_chart(figure(platform_distribution_figure), use_container_width=True)
 
     with col2:
         st.subheader("📊 Engagement by Platform")
-        if not filtered_df.empty:
-            platform_engagement = filtered_df.groupby('platform').agg({
-                'reactions': 'sum',
-                'comments': 'sum',
-                'shares': 'sum'
-            }).reset_index()
-
-            fig = px.bar(
-                platform_engagement,
-                x='platform',
-                y=['reactions', 'comments', 'shares'],
-                barmode='group',
-                color_discrete_sequence=['#FF6B6B', '#4ECDC4', '#45B7D1']
-            )
-            fig.update_layout(
-                margin=dict(t=20, b=20, l=20, r=20),
-                xaxis_title="",
-                yaxis_title="Count",
-                legend_title=""
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        if stats['total_posts']:
+            st.plotly_chart(figure(platform_engagement_figure), use_container_width=True)
+
+    laps.lap('charts')
 
     # Top performers
     st.divider()
@@ -141,249 +454,144 @@ def main():
 
     with col1:
         st.subheader("🏆 Top Creators by Engagement")
-        if not filtered_df.empty and filtered_df['content_creator'].str.strip().any():
-            creator_engagement = filtered_df[filtered_df['content_creator'].str.strip() != ''].groupby('content_creator').agg({
-                'engagement': 'sum',
-                'video_link': 'count'
-            }).rename(columns={'video_link': 'posts'}).sort_values('engagement', ascending=False).head(10)
-
-            fig = px.bar(
-                creator_engagement.reset_index(),
-                x='engagement',
-                y='content_creator',
-                orientation='h',
-                color='engagement',
-                color_continuous_scale='Viridis'
-            )
-            fig.update_layout(
-                margin=dict(t=20, b=20, l=20, r=20),
-                xaxis_title="Total Engagement",
-                yaxis_title="",
-                showlegend=False,
-                yaxis={'categoryorder': 'total ascending'}
-            )
+        fig = figure(top_creators_figure)
+        if fig is not None:
             st.plotly_chart(fig, use_container_width=True)
 
     with col2:
         st.subheader("📹 Top Posts by Engagement")
-        if not filtered_df.empty:
-            top_posts = filtered_df.nlargest(10, 'engagement')[['content_creator', 'platform', 'reactions', 'comments', 'shares', 'views', 'engagement', 'video_link']]
-
-            # Make video links clickable
-            def make_clickable(url):
-                if pd.isna(url) or not url:
-                    return ""
-                short_url = url[:40] + "..." if len(url) > 40 else url
-                return f'<a href="{url}" target="_blank">{short_url}</a>'
-
-            # Show views for platforms that have them
-            def format_views(row):
-                if row['views'] > 0:
-                    return f"{row['views']:,}"
-                return '-'
-
-            display_df = top_posts.copy()
-            display_df['views'] = display_df.apply(format_views, axis=1)
-            display_df['video_link'] = display_df['video_link'].apply(make_clickable)
+        if stats['total_posts']:
+            html = cached(('top_posts',), lambda: top_posts_table(ranking, positions))
+            st.write(html, unsafe_allow_html=True)
 
-            st.write(display_df.to_html(escape=False, index=False), unsafe_allow_html=True)
+    laps.lap('top')
 
-    # ===== FACEBOOK VIEWS SECTION =====
+    # Sections below the fold only compute while their expander is open
     st.divider()
-    st.subheader("📘 Facebook Views")
-
-    # Filter Facebook only with views > 0
-    fb_df = filtered_df[(filtered_df['platform'] == 'Facebook') & (filtered_df['views'] > 0)]
-
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.markdown("**🏆 Top Creators by Views (Facebook)**")
-        if not fb_df.empty:
-            fb_creator_views = fb_df.groupby('content_creator').agg({
-                'views': 'sum',
-                'video_link': 'count'
-            }).rename(columns={'video_link': 'videos'}).sort_values('views', ascending=False).head(10)
-
-            fig = px.bar(
-                fb_creator_views.reset_index(),
-                x='views',
-                y='content_creator',
-                orientation='h',
-                color='views',
-                color_continuous_scale='Blues'
-            )
-            fig.update_layout(
-                margin=dict(t=20, b=20, l=20, r=20),
-                xaxis_title="Total Views",
-                yaxis_title="",
-                showlegend=False,
-                yaxis={'categoryorder': 'total ascending'}
-            )
-            st.plotly_chart(fig, use_container_width=True)
 
-            # Show stats
-            total_fb_views = fb_df['views'].sum()
-            st.success(f"📊 Total Facebook Views: **{total_fb_views:,}** from **{len(fb_df)}** videos")
-        else:
-            st.info("No Facebook views data available yet. Run the scraper to collect views.")
-
-    with col2:
-        st.markdown("**📹 Top 10 Videos by Views (Facebook)**")
-        if not fb_df.empty:
-            top_fb_views = fb_df.nlargest(10, 'views')[['content_creator', 'views', 'reactions', 'comments', 'shares', 'video_link']]
-
-            # Make video links clickable
-            def make_link(url):
-                if pd.isna(url) or not url:
-                    return ""
-                short_url = url[:35] + "..." if len(url) > 35 else url
-                return f'<a href="{url}" target="_blank">{short_url}</a>'
-
-            display_fb_views = top_fb_views.copy()
-            display_fb_views['video_link'] = display_fb_views['video_link'].apply(make_link)
-            display_fb_views['views'] = display_fb_views['views'].apply(lambda x: f"{x:,}")
-
-            st.write(display_fb_views.to_html(escape=False, index=False), unsafe_allow_html=True)
-        else:
-            st.info("No Facebook views data available yet. Run the scraper to collect views.")
+    # ===== FACEBOOK VIEWS SECTION =====
+    with lazy_section("📘 Facebook Views", 'section_facebook') as section:
+        if section.open:
+            # Facebook only with views > 0
+            fb_rows = cube.viewed(rows, platform='Facebook')
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.markdown("**🏆 Top Creators by Views (Facebook)**")
+                if not fb_rows.empty:
+                    st.plotly_chart(figure(creator_views_figure, 'Facebook', 'Blues'), use_container_width=True)
+
+                    # Show stats
+                    total_fb_views = fb_rows['viewed_views'].sum()
+                    st.success(f"📊 Total Facebook Views: **{total_fb_views:,}** from **{fb_rows['viewed_posts'].sum()}** videos")
+                else:
+                    st.info("No Facebook views data available yet. Run the scraper to collect views.")
+
+            with col2:
+                st.markdown("**📹 Top 10 Videos by Views (Facebook)**")
+                if not fb_rows.empty:
+                    html = cached(('top_views', 'Facebook'), lambda: top_views_table(
+                        ranking, index.positions(**combine(filters, platform='Facebook'))
+                    ))
+                    st.write(html, unsafe_allow_html=True)
+                else:
+                    st.info("No Facebook views data available yet. Run the scraper to collect views.")
+
+    laps.lap('facebook')
 
     # ===== TIKTOK VIEWS SECTION =====
-    st.divider()
-    st.subheader("🎵 TikTok Views")
-
-    # Filter TikTok only with views > 0
-    tiktok_df = filtered_df[(filtered_df['platform'] == 'TikTok') & (filtered_df['views'] > 0)]
-
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.markdown("**🏆 Top Creators by Views (TikTok)**")
-        if not tiktok_df.empty:
-            creator_views = tiktok_df.groupby('content_creator').agg({
-                'views': 'sum',
-                'video_link': 'count'
-            }).rename(columns={'video_link': 'videos'}).sort_values('views', ascending=False).head(10)
-
-            fig = px.bar(
-                creator_views.reset_index(),
-                x='views',
-                y='content_creator',
-                orientation='h',
-                color='views',
-                color_continuous_scale='Purples'
-            )
-            fig.update_layout(
-                margin=dict(t=20, b=20, l=20, r=20),
-                xaxis_title="Total Views",
-                yaxis_title="",
-                showlegend=False,
-                yaxis={'categoryorder': 'total ascending'}
-            )
-            st.plotly_chart(fig, use_container_width=True)
-
-            # Show stats
-            total_tiktok_views = tiktok_df['views'].sum()
-            st.success(f"📊 Total TikTok Views: **{total_tiktok_views:,}** from **{len(tiktok_df)}** videos")
-        else:
-            st.info("No TikTok views data available yet. Run the scraper to collect views.")
-
-    with col2:
-        st.markdown("**📹 Top 10 Videos by Views (TikTok)**")
-        if not tiktok_df.empty:
-            top_views = tiktok_df.nlargest(10, 'views')[['content_creator', 'views', 'reactions', 'comments', 'shares', 'video_link']]
-
-            # Make video links clickable
-            def make_link(url):
-                if pd.isna(url) or not url:
-                    return ""
-                short_url = url[:35] + "..." if len(url) > 35 else url
-                return f'<a href="{url}" target="_blank">{short_url}</a>'
-
-            display_views = top_views.copy()
-            display_views['video_link'] = display_views['video_link'].apply(make_link)
-            display_views['views'] = display_views['views'].apply(lambda x: f"{x:,}")
-
-            st.write(display_views.to_html(escape=False, index=False), unsafe_allow_html=True)
-        else:
-            st.info("No TikTok views data available yet. Run the scraper to collect views.")
+    with lazy_section("🎵 TikTok Views", 'section_tiktok') as section:
+        if section.open:
+            # TikTok only with views > 0
+            tiktok_rows = cube.viewed(rows, platform='TikTok')
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.markdown("**🏆 Top Creators by Views (TikTok)**")
+                if not tiktok_rows.empty:
+                    st.plotly_chart(figure(creator_views_figure, 'TikTok', 'Purples'), use_container_width=True)
+
+                    # Show stats
+                    total_tiktok_views = tiktok_rows['viewed_views'].sum()
+                    st.success(f"📊 Total TikTok Views: **{total_tiktok_views:,}** from **{tiktok_rows['viewed_posts'].sum()}** videos")
+                else:
+                    st.info("No TikTok views data available yet. Run the scraper to collect views.")
+
+            with col2:
+                st.markdown("**📹 Top 10 Videos by Views (TikTok)**")
+                if not tiktok_rows.empty:
+                    html = cached(('top_views', 'TikTok'), lambda: top_views_table(
+                        ranking, index.positions(**combine(filters, platform='TikTok'))
+                    ))
+                    st.write(html, unsafe_allow_html=True)
+                else:
+                    st.info("No TikTok views data available yet. Run the scraper to collect views.")
+
+    laps.lap('tiktok')
 
     # ===== VIEWS COMPARISON =====
-    st.divider()
-    st.subheader("📊 Views Comparison by Platform")
-
-    # Get views data for both platforms
-    views_by_platform = filtered_df[filtered_df['views'] > 0].groupby('platform').agg({
-        'views': 'sum',
-        'video_link': 'count'
-    }).rename(columns={'video_link': 'videos'}).reset_index()
-
-    if not views_by_platform.empty:
-        col1, col2 = st.columns(2)
-
-        with col1:
-            fig = px.pie(
-                views_by_platform,
-                values='views',
-                names='platform',
-                title='Total Views Distribution',
-                color_discrete_sequence=['#4267B2', '#000000', '#E1306C']  # FB blue, TikTok black, IG pink
-            )
-            fig.update_layout(margin=dict(t=40, b=20, l=20, r=20))
-            st.plotly_chart(fig, use_container_width=True)
-
-        with col2:
-            # Top 10 Views - All Platforms Combined
-            st.markdown("**🏆 Top 10 by Views (All Platforms)**")
-            top_views_all = filtered_df[filtered_df['views'] > 0].nlargest(10, 'views')[['content_creator', 'platform', 'views', 'reactions', 'video_link']]
-            if not top_views_all.empty:
-                top_display = top_views_all.copy()
-                top_display['Rank'] = range(1, len(top_display) + 1)
-                top_display['views'] = top_display['views'].apply(lambda x: f"{x:,}")
-                top_display['reactions'] = top_display['reactions'].apply(lambda x: f"{x:,}")
-                top_display = top_display[['Rank', 'content_creator', 'platform', 'views', 'reactions']]
-                top_display.columns = ['#', 'Creator', 'Platform', 'Views', 'Reactions']
-                st.dataframe(top_display, hide_index=True, use_container_width=True)
+    with lazy_section("📊 Views Comparison by Platform", 'section_views') as section:
+        if section.open:
+            views_fig = figure(views_distribution_figure)
+
+            if views_fig is not None:
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.plotly_chart(views_fig, use_container_width=True)
+
+                with col2:
+                    # Top 10 Views - All Platforms Combined
+                    st.markdown("**🏆 Top 10 by Views (All Platforms)**")
+                    top_views_all = ranking.top_rows('views', positions, 10, positive=True)[['content_creator', 'platform', 'views', 'reactions', 'video_link']]
+                    if not top_views_all.empty:
+                        top_display = top_views_all.copy()
+                        top_display['Rank'] = range(1, len(top_display) + 1)
+                        top_display['views'] = format_thousands(top_display['views'])
+                        top_display['reactions'] = format_thousands(top_display['reactions'])
+                        top_display = top_display[['Rank', 'content_creator', 'platform', 'views', 'reactions']]
+                        top_display.columns = ['#', 'Creator', 'Platform', 'Views', 'Reactions']
+                        st.dataframe(top_display, hide_index=True, width='stretch')
+                    else:
+                        st.info("No views data available")
             else:
-                st.info("No views data available")
-    else:
-        st.info("No views data available yet. Run the scraper to collect views from Facebook and TikTok.")
+                st.info("No views data available yet. Run the scraper to collect views from Facebook and TikTok.")
+
+    laps.lap('views')
+
+    # ===== GROWTH =====
+    if HISTORY_DB:
+        with lazy_section("📈 Growth", 'section_growth') as section:
+            if section.open:
+                window = st.selectbox("Window", list(GROWTH_WINDOWS), index=1, key='growth_window')
+                hours = GROWTH_WINDOWS[window]
+                # Data may not change for hours, so the window end is part of the key
+                window_end = int(time.time() // GROWTH_FIGURE_SECONDS)
+                growth_fig = cached(('growth', hours, window_end), lambda: growth_figure(hours, filters))
+                if growth_fig is not None:
+                    st.plotly_chart(growth_fig, use_container_width=True)
+                else:
+                    st.info("No view growth recorded in this window yet. History builds up with each refresh.")
+
+        laps.lap('growth')
 
     # All posts table
-    st.divider()
-    st.subheader("📋 All Posts")
-
-    # Sortable dataframe
-    if not filtered_df.empty:
-        display_cols = ['content_creator', 'platform', 'sheet', 'reactions', 'comments', 'shares', 'views', 'engagement', 'video_link']
-        display_df = filtered_df[display_cols].sort_values('engagement', ascending=False).copy()
+    with lazy_section("📋 All Posts", 'section_posts') as section:
+        if section.open:
+            # Server-side paginated table: only the visible page is sent to the browser
+            if stats['total_posts']:
+                render_posts_page(df, ranking, positions, filters, stats['total_posts'])
 
-        # Show views for all platforms that have them
-        display_df['views'] = display_df['views'].apply(
-            lambda x: x if x > 0 else '-'
-        )
-
-        st.dataframe(
-            display_df,
-            column_config={
-                "content_creator": "Creator",
-                "platform": "Platform",
-                "sheet": "Sheet",
-                "reactions": st.column_config.NumberColumn("Reactions", format="%d"),
-                "comments": st.column_config.NumberColumn("Comments", format="%d"),
-                "shares": st.column_config.NumberColumn("Shares", format="%d"),
-                "views": st.column_config.TextColumn("Views"),
-                "engagement": st.column_config.NumberColumn("Total", format="%d"),
-                "video_link": st.column_config.LinkColumn("Video Link", display_text="Open")
-            },
-            height=600,
-            use_container_width=True,
-            hide_index=True
-        )
+    laps.lap('posts')
 
     # Footer
     st.divider()
-    st.caption(f"Data source: Google Sheets | {len(filtered_df)} posts displayed")
+    st.caption(f"Data source: Google Sheets | {stats['total_posts']} posts displayed")
+
+    if ADMIN_PANEL or st.query_params.get('admin') == '1':
+        admin_panel(tracer, figures)
 
 
 if __name__ == "__main__":
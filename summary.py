@@ -0,0 +1,122 @@
+"""
+Summary Statistics
+Post count, metric totals and posts per platform and per creator, with
+one numpy reduction per metric column and platforms counted straight
+from their categorical codes. Creator counts are only worked out when
+read. Summaries add and subtract, so after an incremental reload the
+dataset totals are updated from the re-parsed tabs alone instead of
+being summed again over every row.
+"""
+
+from collections.abc import Mapping
+import numpy as np
+import pandas as pd
+from schema import METRIC_COLUMNS
+
+# Keys of a Summary, in the order get_summary_stats() always used
+KEYS = ['total_posts'] + [f"total_{col}" for col in METRIC_COLUMNS] + ['platforms', 'creators']
+
+
+class Summary(Mapping):
+    """
+    Totals of some rows, read like the old get_summary_stats() dict:
+    total_posts, total_<metric>, platforms (posts per platform, largest
+    first) and creators (posts per creator, counted on first access).
+    """
+
+    def __init__(self, posts=0, totals=None, platforms=None, creators=None):
+        self.posts = int(posts)
+        self.totals = np.zeros(len(METRIC_COLUMNS), dtype=np.int64) if totals is None else totals
+        self._platforms = platforms or {}
+        self._creators = creators or {}  # Or a callable that builds them
+
+    @property
+    def platforms(self):
+        return _sorted_counts(self._platforms)
+
+    @property
+    def creators(self):
+        return _sorted_counts(self._creator_counts())
+
+    def _creator_counts(self):
+        if callable(self._creators):
+            self._creators = self._creators()
+        return self._creators
+
+    def __getitem__(self, key):
+        if key == 'total_posts':
+            return self.posts
+        if key == 'platforms':
+            return self.platforms
+        if key == 'creators':
+            return self.creators
+        if key.startswith('total_') and key[6:] in METRIC_COLUMNS:
+            return int(self.totals[METRIC_COLUMNS.index(key[6:])])
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(KEYS)
+
+    def __len__(self):
+        return len(KEYS)
+
+    def __repr__(self):
+        totals = ', '.join(f"{key}={self[key]}" for key in KEYS[:-2])
+        return f"Summary({totals}, platforms={self.platforms})"
+
+    def __add__(self, other):
+        return self._combine(other, 1)
+
+    def __sub__(self, other):
+        return self._combine(other, -1)
+
+    def _combine(self, other, sign):
+        return Summary(
+            self.posts + sign * other.posts,
+            self.totals + sign * other.totals,
+            _add_counts(self._platforms, other._platforms, sign),
+            lambda: _add_counts(self._creator_counts(), other._creator_counts(), sign),
+        )
+
+
+def _add_counts(counts, other, sign=1):
+    total = dict(counts)
+    for key, count in other.items():
+        total[key] = total.get(key, 0) + sign * count
+    return total
+
+
+def _sorted_counts(counts):
+    """Positive counts, largest first."""
+    return dict(sorted(((key, count) for key, count in counts.items() if count > 0),
+                       key=lambda item: item[1], reverse=True))
+
+
+def category_counts(column):
+    """
+    Rows per value of column. Categorical columns are counted with one
+    bincount over their codes rather than by hashing every value.
+    """
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        return {key: int(count) for key, count in column.value_counts(sort=False).items()}
+
+    codes = column.cat.codes.to_numpy()
+    categories = column.cat.categories
+    try:
+        counts = np.bincount(codes, minlength=len(categories))
+    except ValueError:  # Missing values have code -1
+        counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+    return {key: int(count) for key, count in zip(categories, counts) if count}
+
+
+def summarize(df):
+    """Summary of every row of df."""
+    if df.empty:
+        return Summary()
+
+    totals = np.array([
+        df[col].to_numpy().sum(dtype=np.int64) if col in df.columns else 0
+        for col in METRIC_COLUMNS
+    ], dtype=np.int64)
+    creators = df['content_creator']
+    return Summary(len(df), totals, category_counts(df['platform']), lambda: category_counts(creators))
@@ -0,0 +1,74 @@
+"""
+Fetch Retry Tests
+Rate-limit retries, errors that must not be retried and the refetch of
+tabs whose header moved, with failures injected through
+fake_sheets.FakeClient.
+"""
+
+import pandas as pd
+import pytest
+from gspread.exceptions import APIError
+import fetch_scheduler
+import sheets_reader
+from fake_sheets import FakeClient, make_workbook
+from sheets_reader import DataCache, read_all_data, refresh_data
+from config import SHEET_ID
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Retry straight away instead of sleeping out the backoff."""
+    monkeypatch.setattr(fetch_scheduler, 'BACKOFF_BASE', 0.0)
+
+
+def fresh_load(client):
+    """read_all_data() as a new process would run it, with no known layouts."""
+    sheets_reader._layouts.clear()
+    return read_all_data(client)
+
+
+def test_rate_limited_requests_are_retried():
+    client = FakeClient(make_workbook(tabs=4, rows_per_tab=20))
+    expected = fresh_load(client)
+
+    client.reset_counters()
+    client.fail_next(2)
+    pd.testing.assert_frame_equal(fresh_load(client), expected)
+    assert client.error_count == 2
+    # One batchGet for the four tabs, sent again after each 429
+    assert client.request_log.count('values_batch_get') == 1 + 2
+
+
+def test_random_rate_limits_are_retried():
+    expected = fresh_load(FakeClient(make_workbook(tabs=25, rows_per_tab=20)))
+    client = FakeClient(make_workbook(tabs=25, rows_per_tab=20), error_rate=0.3, seed=3)
+    pd.testing.assert_frame_equal(fresh_load(client), expected)
+    assert client.error_count > 0
+    # Three chunks of up to ten tabs, plus one resend per failure
+    assert client.request_log.count('values_batch_get') == 3 + client.error_count
+
+
+def test_forbidden_is_not_retried():
+    client = FakeClient(make_workbook(tabs=4, rows_per_tab=20))
+    client.fail_next(1, status=403)
+    with pytest.raises(APIError):
+        fresh_load(client)
+    assert client.error_count == 1
+    assert client.request_log.count('values_batch_get') == 1
+
+
+def test_moved_header_is_fetched_again_in_full():
+    client = FakeClient(make_workbook(tabs=4, rows_per_tab=20))
+    cache = DataCache()
+    refresh_data(cache, client)  # Learns the layouts
+
+    spreadsheet = client.open_by_key(SHEET_ID)
+    rows = [list(row) for row in spreadsheet.worksheet('Creator Tab 3').values]
+    spreadsheet.set_values('Creator Tab 3', [['Notes'] + [''] * 5] + rows)
+
+    client.reset_counters()
+    assert refresh_data(cache, client) == [(SHEET_ID, 'Creator Tab 3')]
+    # The projected batch, then the stale tab alone
+    assert client.request_log.count('values_batch_get') == 2
+    assert client.error_count == 0
+    pd.testing.assert_frame_equal(cache.df, fresh_load(client))
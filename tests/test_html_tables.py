@@ -0,0 +1,31 @@
+"""
+HTML Table Tests
+Escaping of creator names and links in render_table(), and the number
+formatting it shares with the dashboard's other tables.
+"""
+
+import pandas as pd
+from html_tables import format_thousands, render_table
+
+
+def test_text_and_links_are_escaped():
+    html = render_table(pd.DataFrame({
+        'content_creator': ['<script>alert(1)</script>', 'Say "hi" & \'bye\''],
+        'views': [1234567, 0],
+        'video_link': ['javascript:alert(1)', 'https://youtu.be/x?a=1&b="2"'],
+    }), comma_columns=['views'], blank_zero_columns=['views'])
+
+    assert '<script>' not in html
+    assert '&lt;script&gt;alert(1)&lt;/script&gt;' in html
+    assert 'Say &quot;hi&quot; &amp; &#x27;bye&#x27;' in html
+    # Only http(s) URLs become links; others are shown as escaped text
+    assert 'href="javascript:' not in html
+    assert '<td>javascript:alert(1)</td>' in html
+    assert '<a href="https://youtu.be/x?a=1&amp;b=&quot;2&quot;" target="_blank">' in html
+    assert '<td>1,234,567</td>' in html
+    assert '<td>-</td>' in html
+
+
+def test_format_thousands():
+    values = pd.Series([0, 999, 1000, 1234567, -45678], dtype='int64')
+    assert format_thousands(values).tolist() == [f"{value:,}" for value in values]
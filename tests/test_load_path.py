@@ -0,0 +1,145 @@
+"""
+Load Path Tests
+parse_sheet() against the original row loop, and incremental
+refreshes, snapshot restores and projected fetches against a fresh full
+load, all served by fake_sheets.FakeClient.
+"""
+
+import pandas as pd
+import pytest
+import sheets_reader
+from benchmarks.bench_parse import parse_sheet_rows
+from fake_sheets import FakeClient, make_messy_workbook, make_workbook
+from history import connect
+from sheets_reader import (
+    DataCache, load_snapshot, parse_sheet, read_all_data, refresh_and_save, refresh_data, save_snapshot,
+)
+from summary import summarize
+from config import BATCH_GET_MAX_TABS, SHEET_ID
+
+# A video linked from two tabs, the second time with a tracking parameter
+SHARED_LINK = 'https://www.tiktok.com/@creator/video/7000000000000000001'
+
+
+def workbook_with_shared_video(tabs=4, rows_per_tab=40):
+    """make_workbook() with SHARED_LINK added to the first and the last tab."""
+    workbook = make_workbook(tabs, rows_per_tab)
+    titles = list(workbook)
+    workbook[titles[0]].append(['Creator 1', SHARED_LINK, '10', '2', '1', '100'])
+    workbook[titles[-1]].append(['Creator 2', SHARED_LINK + '?is_from_webapp=1', '30', '4', '3', '900'])
+    return workbook
+
+
+def edit_tab(client, title, edit):
+    """Replace a tab's rows with edit(rows), as a user editing the sheet would."""
+    spreadsheet = client.open_by_key(SHEET_ID)
+    rows = [list(row) for row in spreadsheet.worksheet(title).values]
+    spreadsheet.set_values(title, edit(rows))
+
+
+def assert_matches_fresh_load(cache, client):
+    """cache holds what a new process reading the sheet from scratch would load."""
+    sheets_reader._layouts.clear()
+    expected = read_all_data(client)
+    pd.testing.assert_frame_equal(cache.df, expected)
+    assert dict(cache.summary()) == dict(summarize(expected))
+
+
+@pytest.mark.parametrize('make', [make_workbook, make_messy_workbook])
+def test_parse_sheet_matches_row_loop(make):
+    for title, values in make(tabs=5, rows_per_tab=200).items():
+        pd.testing.assert_frame_equal(parse_sheet(title, values), parse_sheet_rows(title, values))
+
+
+@pytest.mark.parametrize('projected', [False, True])
+def test_incremental_refresh_matches_full_load(monkeypatch, projected):
+    monkeypatch.setattr(sheets_reader, 'PROJECTED_FETCH', projected)
+    client = FakeClient(make_messy_workbook(tabs=6, rows_per_tab=80))
+    cache = DataCache()
+    refresh_data(cache, client)
+
+    def bump_metrics(rows):
+        for row in rows[-10:]:
+            row[-1] = '12,345'
+        return rows[:-3]
+
+    edit_tab(client, 'Creator Tab 2', bump_metrics)
+    assert refresh_data(cache, client) == [(SHEET_ID, 'Creator Tab 2')]
+    assert_matches_fresh_load(cache, client)
+
+
+def test_load_requests():
+    client = FakeClient(make_workbook(tabs=40, rows_per_tab=50))
+    cache = DataCache()
+    refresh_data(cache, client)
+    # The tab list, then the tabs in values:batchGet chunks; never one call per tab
+    batches = -(-40 // BATCH_GET_MAX_TABS)
+    assert client.request_log.count('values_batch_get') == batches
+    assert client.request_log.count('get_all_values') == 0
+    assert client.request_count == batches + 3  # Drive metadata, open_by_key, worksheets
+
+    # An unchanged sheet costs only the Drive metadata check
+    client.reset_counters()
+    assert refresh_data(cache, client) == []
+    assert client.request_log == ['get_file_drive_metadata']
+
+    # After an edit the projected fetch needs no more requests than the full one
+    client.open_by_key(SHEET_ID).touch()
+    client.reset_counters()
+    assert refresh_data(cache, client) == []
+    assert client.request_log.count('values_batch_get') == batches
+    assert client.request_log.count('get_all_values') == 0
+
+
+def test_projected_refresh_only_reparses_edited_tab():
+    client = FakeClient(make_workbook(tabs=6, rows_per_tab=50))
+    cache = DataCache()
+    refresh_data(cache, client)  # Full fetch: layouts aren't known yet
+
+    client.reset_counters()
+    client.open_by_key(SHEET_ID).touch()
+    assert refresh_data(cache, client) == []  # Projected fetch of unchanged tabs
+    assert client.request_log.count('values_batch_get') == 1
+
+    edit_tab(client, 'Creator Tab 4', lambda rows: rows + [['Creator 9', 'https://youtu.be/abcdefghijk', '1', '1', '1', '1']])
+    assert refresh_data(cache, client) == [(SHEET_ID, 'Creator Tab 4')]
+    assert_matches_fresh_load(cache, client)
+
+
+@pytest.mark.parametrize('projected', [False, True])
+def test_snapshot_round_trip_then_refresh(tmp_path, monkeypatch, projected):
+    monkeypatch.setattr(sheets_reader, 'PROJECTED_FETCH', projected)
+    client = FakeClient(workbook_with_shared_video())
+    cache = DataCache()
+    refresh_data(cache, client)
+    refresh_data(cache, client, force=True)  # Hashes from projected fetches, when on
+    assert cache.duplicates is not None and len(cache.duplicates) == 1
+
+    path = tmp_path / 'snapshot.arrow'
+    save_snapshot(cache, str(path))
+    sheets_reader._layouts.clear()  # A new process
+    restored = load_snapshot(str(path))
+    pd.testing.assert_frame_equal(restored.df, cache.df)
+
+    # Without its first copy, the later tab's row of the shared video comes back
+    edit_tab(client, 'Creator Tab 1', lambda rows: [row for row in rows if row[1] != SHARED_LINK])
+    assert refresh_data(restored, client) == [(SHEET_ID, 'Creator Tab 1')]
+    assert (restored.df['video_link'] == SHARED_LINK + '?is_from_webapp=1').sum() == 1
+    assert_matches_fresh_load(restored, client)
+
+
+def test_failed_snapshot_still_records_history(tmp_path, monkeypatch):
+    def fail(*args):
+        raise OSError('snapshot is locked')
+
+    monkeypatch.setattr(sheets_reader.os, 'replace', fail)
+    client = FakeClient(make_workbook(tabs=3, rows_per_tab=20))
+    history_path = str(tmp_path / 'history.sqlite')
+    with pytest.raises(OSError):
+        refresh_and_save(DataCache(), client, str(tmp_path / 'snapshot.arrow'), history_path=history_path)
+
+    conn = connect(history_path)
+    try:
+        assert conn.execute('SELECT COUNT(*) FROM latest').fetchone()[0] > 0
+    finally:
+        conn.close()
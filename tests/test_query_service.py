@@ -0,0 +1,82 @@
+"""
+Query Service Tests
+The HTTP service on a free local port, answering from a DataCache
+loaded from fake_sheets.FakeClient: ETag revalidation, new ETags after
+a refresh changes the data, and the status code of each kind of error.
+"""
+
+import json
+import threading
+import urllib.error
+import pytest
+from fake_sheets import FakeClient, make_workbook
+from query_service import QueryClient, QueryService, make_server
+from sheets_reader import DataCache, refresh_data
+from config import SHEET_ID
+
+
+@pytest.fixture
+def served():
+    """(FakeClient, QueryService, base URL) for a small workbook served on a free port."""
+    sheets = FakeClient(make_workbook(tabs=3, rows_per_tab=30))
+    cache = DataCache()
+    refresh_data(cache, sheets)
+    service = QueryService(cache)
+    server = make_server(service, '127.0.0.1', 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield sheets, service, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def error_of(client, path, **params):
+    """HTTP status and decoded error message of a request that fails."""
+    with pytest.raises(urllib.error.HTTPError) as info:
+        client.get(path, **params)
+    return info.value.code, json.loads(info.value.read())['error']
+
+
+def test_repeated_query_is_not_modified(served):
+    _, _, url = served
+    client = QueryClient(url)
+    first = client.top(metric='views', n=5)
+    assert client.top(metric='views', n=5) == first
+    assert client.not_modified == 1
+
+    # Another query has its own ETag
+    client.top(metric='views', n=6)
+    assert client.not_modified == 1
+
+
+def test_refresh_with_new_data_changes_etag(served):
+    sheets, service, url = served
+    client = QueryClient(url)
+    before = client.summary()
+    (etag, _), = client.responses.values()
+
+    spreadsheet = sheets.open_by_key(SHEET_ID)
+    rows = [list(row) for row in spreadsheet.worksheet('Creator Tab 1').values]
+    spreadsheet.set_values('Creator Tab 1', rows + [['Creator 9', 'https://youtu.be/abcdefghijk', '1', '2', '3', '4']])
+    refresh_data(service.cache, sheets)
+
+    after = client.summary()
+    assert client.not_modified == 0
+    assert client.responses[f"{url}/summary"][0] != etag
+    assert after['total_posts'] == before['total_posts'] + 1
+
+
+def test_error_statuses(served, monkeypatch):
+    client = QueryClient(served[2])
+    assert error_of(client, '/top', n='ten') == (400, 'n must be an integer')
+    assert error_of(client, '/top', metric='likes')[0] == 400
+    assert error_of(client, '/nowhere')[0] == 404
+
+    def broken(self, context, params):
+        raise RuntimeError('rollup went missing')
+
+    monkeypatch.setitem(QueryService.QUERIES, '/groups', broken)
+    assert error_of(client, '/groups') == (500, 'RuntimeError: rollup went missing')
+    # The server is still answering
+    assert client.summary()['total_posts'] > 0
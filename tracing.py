@@ -0,0 +1,167 @@
+"""
+Tracing
+Timing spans for the load path: authentication, spreadsheet metadata,
+each fetch request, parsing, assembly and the dashboard sections. Spans
+are kept in a bounded in-memory buffer, summarised per name for the
+admin panel and --profile, and can be exported as JSON lines.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from config import TRACE_MAX_SPANS, TRACE_FILE
+
+# Span attributes summed per span name in summary()
+SUMMED_ATTRS = ('bytes', 'rows', 'cells', 'tabs', 'requests')
+
+
+class Tracer:
+    """Records finished spans as dicts: name, start, duration, thread plus attributes."""
+
+    def __init__(self, max_spans=TRACE_MAX_SPANS, path=TRACE_FILE):
+        self.spans = deque(maxlen=max_spans)
+        self.path = path
+        self.lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, name, duration, start=None, **attrs):
+        """Add a span measured elsewhere (e.g. from an HTTP response)."""
+        stack = getattr(self._local, 'stack', None)
+        span = {
+            'name': name,
+            'start': time.time() - duration if start is None else start,
+            'duration': duration,
+            'thread': threading.current_thread().name,
+        }
+        if stack:
+            span['parent'] = stack[-1][0]
+        span.update(attrs)
+        with self.lock:
+            self.spans.append(span)
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(span, default=str) + '\n')
+        return span
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """
+        Time the enclosed block. Yields the attribute dict, so the block
+        can add counts (rows, bytes, cache='hit') it only knows at the end.
+        """
+        stack = self._local.__dict__.setdefault('stack', [])
+        start = time.time()
+        began = time.perf_counter()
+        stack.append((name, attrs))
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            stack.pop()
+            self.record(name, time.perf_counter() - began, start, **attrs)
+
+    def count(self, attr, amount=1):
+        """Add amount to attr of the innermost open span on this thread, if any."""
+        stack = getattr(self._local, 'stack', None)
+        if stack:
+            attrs = stack[-1][1]
+            attrs[attr] = attrs.get(attr, 0) + amount
+
+    def laps(self, prefix):
+        """A Laps timer whose spans are named '<prefix>.<lap name>'."""
+        return Laps(self, prefix)
+
+    def snapshot(self, name=None):
+        """Copy of the recorded spans, optionally only those called name."""
+        with self.lock:
+            return [span for span in self.spans if name is None or span['name'] == name]
+
+    def summary(self):
+        """
+        Per span name: count, total/mean/max seconds, error count and the
+        summed SUMMED_ATTRS, slowest total first.
+        """
+        rows = {}
+        for span in self.snapshot():
+            row = rows.setdefault(span['name'], {'name': span['name'], 'count': 0, 'total': 0.0, 'max': 0.0, 'errors': 0})
+            row['count'] += 1
+            row['total'] += span['duration']
+            row['max'] = max(row['max'], span['duration'])
+            row['errors'] += 'error' in span
+            for attr in SUMMED_ATTRS:
+                if isinstance(span.get(attr), (int, float)):
+                    row[attr] = row.get(attr, 0) + span[attr]
+        for row in rows.values():
+            row['mean'] = row['total'] / row['count']
+        return sorted(rows.values(), key=lambda row: row['total'], reverse=True)
+
+    def to_jsonl(self):
+        """The recorded spans as JSON lines."""
+        return ''.join(json.dumps(span, default=str) + '\n' for span in self.snapshot())
+
+    def export_jsonl(self, path):
+        """Write the recorded spans to path as JSON lines; returns the span count."""
+        spans = self.snapshot()
+        with open(path, 'w', encoding='utf-8') as f:
+            for span in spans:
+                f.write(json.dumps(span, default=str) + '\n')
+        return len(spans)
+
+    def clear(self):
+        with self.lock:
+            self.spans.clear()
+
+
+class Laps:
+    """
+    Back-to-back spans without nesting the code under `with` blocks:
+    each lap(name) records the time since the previous lap.
+    """
+
+    def __init__(self, tracer, prefix):
+        self.tracer = tracer
+        self.prefix = prefix
+        self.started_at = time.time()
+        self.last = time.perf_counter()
+
+    def lap(self, name, **attrs):
+        """Record the time since the previous lap (or since creation) as one span."""
+        now = time.perf_counter()
+        self.tracer.record(f"{self.prefix}.{name}", now - self.last, self.started_at, **attrs)
+        self.started_at += now - self.last
+        self.last = now
+
+
+def format_summary(summary):
+    """Plain-text table of Tracer.summary() rows, for --profile."""
+    lines = [f"{'span':<28}{'count':>7}{'total s':>10}{'mean ms':>10}{'max ms':>10}{'rows':>10}{'KiB':>10}"]
+    for row in summary:
+        kib = f"{row['bytes'] / 1024:,.0f}" if 'bytes' in row else ''
+        rows = f"{row['rows']:,}" if 'rows' in row else ''
+        lines.append(
+            f"{row['name']:<28}{row['count']:>7}{row['total']:>10.3f}"
+            f"{row['mean'] * 1000:>10.1f}{row['max'] * 1000:>10.1f}{rows:>10}{kib:>10}"
+        )
+    return '\n'.join(lines)
+
+
+_default_tracer = None
+_default_tracer_lock = threading.Lock()
+
+
+def default_tracer():
+    """Process-wide Tracer shared by sheets_reader and the dashboard."""
+    global _default_tracer
+    with _default_tracer_lock:
+        if _default_tracer is None:
+            _default_tracer = Tracer()
+        return _default_tracer
+
+
+def span(name, **attrs):
+    """default_tracer().span(name, **attrs)"""
+    return default_tracer().span(name, **attrs)
@@ -0,0 +1,147 @@
+"""
+Video URLs
+Canonical keys for Facebook, Instagram, TikTok and YouTube links, so the
+same video is recognised across tabs and tracking parameters. Keys are
+extracted in bulk with precompiled patterns, and the most recently seen
+raw URLs keep their keys in a bounded LRU, so links that were seen
+recently are usually not parsed again.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from config import VIDEO_KEY_CACHE_SIZE
+
+# (platform, pattern capturing the video id); first match wins
+VIDEO_ID_PATTERNS = [
+    ('facebook', re.compile(
+        r'(?:facebook|fb)\.com/(?:[^/?#]+/)?(?:videos|reel|reels)/(?:[^/?#]+/)?(\d+)', re.IGNORECASE)),
+    ('facebook', re.compile(
+        r'(?:facebook|fb)\.com/(?:watch/?|video\.php)\?(?:[^#]*&)?v=(\d+)', re.IGNORECASE)),
+    ('instagram', re.compile(
+        r'instagram\.com/(?:[\w.]+/)?(?:reels?|p|tv)/([\w-]+)', re.IGNORECASE)),
+    ('tiktok', re.compile(
+        r'tiktok\.com/(?:@[^/?#]+/(?:video|photo)|v|embed(?:/v2)?)/(\d+)', re.IGNORECASE)),
+    ('youtube', re.compile(
+        r'youtube\.com/(?:watch\?(?:[^#]*&)?v=|shorts/|embed/|live/|v/)([\w-]{11})', re.IGNORECASE)),
+    ('youtube', re.compile(
+        r'youtu\.be/([\w-]{11})', re.IGNORECASE)),
+]
+
+
+class LRUCache:
+    """Thread-safe least-recently-used map with a fixed number of entries."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get_many(self, keys):
+        """{key: value} for the keys present, marking them recently used."""
+        with self.lock:
+            entries = self.entries
+            found = {key: entries[key] for key in keys if key in entries}
+            for key in found:
+                entries.move_to_end(key)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        with self.lock:
+            for key, value in items:
+                self.entries[key] = value
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+
+_keys = LRUCache(VIDEO_KEY_CACHE_SIZE)
+
+
+# Query parameters that only track where a link was shared from
+TRACKING_PARAMS = re.compile(
+    r'(?<=[?&])(?:utm_\w+|fbclid|gclid|igsh|igshid|si|mibextid|rdid|ref|ref_src|'
+    r'feature|is_from_webapp|sender_device|share_app_id|_r|_t)=[^&#]*&?',
+    re.IGNORECASE,
+)
+
+
+def canonical_urls(urls):
+    """
+    URLs without scheme, fragment, tracking parameters, trailing slash or
+    www./m. prefix and with a lowercase host, for a Series of URLs.
+    """
+    urls = urls.str.strip().str.replace(r'^[a-z][a-z0-9+.-]*://', '', case=False, regex=True)
+    urls = urls.str.replace(r'#.*$', '', regex=True).str.replace(TRACKING_PARAMS, '', regex=True)
+    urls = urls.str.rstrip('?&').str.rstrip('/').str.replace('/?', '?', regex=False)
+    parts = urls.str.partition('/')
+    host = parts[0].str.lower().str.replace(r'^(?:www|m|mobile|web)\.', '', regex=True)
+    return host + parts[1] + parts[2]
+
+
+def extract_video_keys(urls):
+    """
+    Video key per URL for a Series of URLs: 'platform:id' when a known
+    link shape matches, else the canonical URL.
+    """
+    urls = urls.astype(object)
+    keys = pd.Series(None, index=urls.index, dtype=object)
+    for platform, pattern in VIDEO_ID_PATTERNS:
+        pending = keys.isna()
+        if not pending.any():
+            break
+        ids = urls[pending].str.extract(pattern, expand=False)
+        matched = ids.dropna()
+        keys[matched.index] = platform + ':' + matched
+
+    pending = keys.isna()
+    if pending.any():
+        keys[pending] = canonical_urls(urls[pending])
+    return keys
+
+
+def video_keys(urls):
+    """
+    Video key per URL, as an object array aligned with urls. Each distinct
+    URL is looked up in the LRU and only the misses are extracted.
+    """
+    codes, uniques = pd.factorize(urls)
+    uniques = uniques.to_numpy(dtype=object).tolist()
+    known = _keys.get_many(uniques)
+
+    missing = [url for url in uniques if url not in known]
+    if missing:
+        extracted = extract_video_keys(pd.Series(missing, dtype=object))
+        known.update(zip(missing, extracted))
+        _keys.put_many(zip(missing, extracted))
+
+    # The trailing None is what missing URLs (code -1) pick up
+    lookup = np.array([known[url] for url in uniques] + [None], dtype=object)
+    return lookup[codes]
+
+
+def duplicate_videos(df, column='video_link'):
+    """
+    Boolean mask of the rows whose video key already appeared in an
+    earlier row, or None when there are none. Uses the frame's video_key
+    column when it has one, else extracts keys from column.
+    """
+    if df.empty:
+        return None
+    if 'video_key' in df.columns:
+        keys = df['video_key']
+    else:
+        keys = pd.Series(video_keys(df[column]))
+    duplicated = (keys.duplicated() & keys.notna()).to_numpy()
+    if not duplicated.any():
+        return None
+    return duplicated